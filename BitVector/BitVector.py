@@ -509,7 +509,13 @@ ACCESSING AND SETTING INDIVIDUAL BITS AND SLICES:
 
         is a bit vector constructed from the bits at index positions from i
         through j-1.  This is made possible by the implementation of the
-        __getslice__ method.
+        __getslice__ method.  Extended slices, as in
+
+            bv[i:j:k]
+
+        are also supported.  Slicing copies only the words that hold the
+        bits of the slice, so extracting a short field from a very long
+        bit vector is fast.
 
     @tag4
     (4) You can also carry out slice assignment:
@@ -524,7 +530,9 @@ ACCESSING AND SETTING INDIVIDUAL BITS AND SLICES:
         of the bit vector bv1 according to the first three bits of bv2.
         The second slice assignment will set the first three bits of bv1
         according to the three bits in bv3.  This is made possible by the
-        slice setting code in the __setitem__ method.
+        slice setting code in the __setitem__ method.  The bit vector on
+        the right must have as many bits as the slice on the left, or a
+        ValueError is raised.  Extended slices can also be assigned to.
 
     @tag5
     (5) You can iterate over a bit vector, as illustrated by
@@ -581,6 +589,22 @@ LOGICAL OPERATIONS ON BIT VECTORS:
         These are made possible by implementing the __xor__, __and__,
         __or__, and __invert__ methods, respectively.
 
+        The augmented assignments
+
+            bv1 ^= bv2
+            bv1 &= bv2
+            bv1 |= bv2
+
+        change the bits of bv1 in place instead of creating a new bit
+        vector.  They can also be invoked as the methods
+
+            bv1.xor_into(bv2)
+            bv1.and_into(bv2)
+            bv1.or_into(bv2)
+
+        which return bv1.  As for the binary operators, if bv2 is longer
+        than bv1, bv1 is first padded with zeros from the left.
+
 
 @title
 COMPARING BIT VECTORS:
@@ -601,6 +625,19 @@ COMPARING BIT VECTORS:
         overloadings are made possible by providing implementation code for
         __eq__, __ne__, __lt__, __le__, __gt__, and __ge__, respectively.
 
+        Two bitvectors are equal only if they are of the same size and have
+        the same bits.  Since bitvectors are also hashable, with equal
+        bitvectors having equal hash values, you can use them as dictionary
+        keys and as set members:
+
+            seen = set()
+            seen.add(BitVector(bitstring = '0110'))
+            print(BitVector(hexstring = '6') in seen)      # True
+            print(BitVector(bitstring = '110') in seen)    # False
+
+        Do not change a bitvector while it is a dictionary key or a set
+        member.
+
 
 @title
 OTHER SUPPORTED OPERATIONS:
@@ -771,6 +808,15 @@ OTHER SUPPORTED OPERATIONS:
         bitvector on which the method is invoked is not a multiple of 8.
         This method does not return anything.
 
+        To write out a whole sequence of bitvectors, such as the output
+        blocks of a block cipher, call
+
+            BitVector.write_bitvectors_to_file(FILEOUT, blocks)
+
+        where blocks can be any iterable of bitvectors.  Their bytes are
+        written out in large chunks rather than with one write() call per
+        bitvector.
+
         IMPORTANT FOR WINDOWS USERS: When writing an internally generated
                     bit vector out to a disk file, it is important to open
                     the file in the binary mode as shown.  Otherwise, the
@@ -814,6 +860,23 @@ OTHER SUPPORTED OPERATIONS:
         by using the syntax 'if x in y'.  This is made possible by the
         override definition for the special __contains__ method.
 
+        To find out where x occurs in y, call
+
+            y = BitVector(bitstring = '0001101011010110')
+            x = BitVector(bitstring = '1011')
+            print(y.find(x))                                # 6
+            print(y.rfind(x))                               # 11
+            print(y.find_all(x))                            # [6, 11]
+            print(y.count_occurrences(x))                   # 2
+
+        As with the methods of the same names for strings, find() and
+        rfind() return -1 if x does not occur in y, and all four methods
+        take optional start and end arguments to limit the search to the
+        index positions start through end-1.  Overlapping occurrences are
+        all counted.  All the occurrences are found together in a single
+        bit-parallel pass per bit of x, so the search is fast for the short
+        patterns, such as sync words, that one usually looks for.
+
    @tag24
    (24) set_value()
 
@@ -860,7 +923,9 @@ OTHER SUPPORTED OPERATIONS:
             print(bv.count_bits_sparse())          # 5
 
         A call to count_bits_sparse() returns an integer whose value is the
-        number of bits set in the bitvector.
+        number of bits set in the bitvector.  Since count_bits() and
+        count_bits_sparse() now count the bits of all the words in a single
+        step, the two are equally fast for sparse and dense bitvectors.
 
    @tag27
    (27) jaccard_similarity()
@@ -897,6 +962,16 @@ OTHER SUPPORTED OPERATIONS:
         no next set bit is found, the method returns -1.  A call to
         next_set_bit() always returns a number.
 
+        The same goes for the other methods for finding bits, which skip
+        whole words at a time:
+
+            bv = BitVector(bitstring = '0011100000001100')
+            print(bv.prev_set_bit(10))                      # 4
+            print(bv.next_clear_bit(2))                     # 5
+            print(bv.prev_clear_bit(13))                    # 11
+            print(bv.first_set_bit())                       # 2
+            print(bv.last_set_bit())                        # 13
+
    @tag29
    (29) rank_of_bit_set_at_index()
 
@@ -913,6 +988,23 @@ OTHER SUPPORTED OPERATIONS:
         set at the argument position. Otherwise, it returns the rank as a
         number.
 
+        For any position, rank1(i) returns the number of bits set at the
+        positions 0 through i, and rank0(i) the number of bits not set.
+        Going the other way, select1(k) and select0(k) return the position
+        of the k-th bit that is set or not set, counting from k = 1:
+
+            bv = BitVector(bitstring = '01010101011100')
+            print(bv.rank1(9))                              # 5
+            print(bv.rank0(9))                              # 5
+            print(bv.select1(6))                            # 10
+            print(bv.select0(1))                            # 0
+
+        The first of these calls builds a directory of the bit counts of
+        the bitvector in blocks of 512 bits, which takes up less than 5
+        percent of the memory of the bits.  With the directory in place, a rank query
+        takes constant time and a select query a binary search.  The
+        directory is rebuilt after the bitvector is changed.
+
    @tag30
    (30) is_power_of_2()
         is_power_of_2_sparse()
@@ -1056,6 +1148,14 @@ OTHER SUPPORTED OPERATIONS:
         The object returned by runs() is a list of strings, with each
         element of this list being a string of 1's and 0's.
 
+        For long bitvectors, it is more economical to describe each run by
+        its bit value, its starting position and its length:
+
+           print(bv.run_lengths())        # [(1, 0, 3), (0, 3, 2), (1, 5, 1)]
+
+        run_lengths() finds the ends of the runs without examining the bits
+        one by one.  (runs() now calls run_lengths() too.)
+
    @tag39
    (39) gen_random_bits()
 
@@ -1116,7 +1216,13 @@ OTHER SUPPORTED OPERATIONS:
             print myhexstring                      # 68656c6c6
 
         This method throws an exception if the size of the bitvector is not
-        a multiple of 4.  The method returns a string.
+        a multiple of 4, unless you call it as
+
+            print(BitVector(bitstring = '1011001').get_bitvector_in_hex(pad = True))
+                                                   # b2
+
+        in which case the last bits are padded with zeros on the right to
+        make up the last hex digit.  The method returns a string.
 
    @tag43
    (43) close_file_object()
@@ -1133,31 +1239,188 @@ OTHER SUPPORTED OPERATIONS:
         for reading the bits.  It is this file object that is closed when
         you call close_file_object().
 
+   @tag44
+   (44) rotated_left()
+        rotated_right()
+        shifted_left()
+        shifted_right()
+
+        Whereas the operators '<<' and '>>' and the methods shift_left()
+        and shift_right() change the bitvector on which they are invoked,
+        the following calls leave it alone and return new bitvectors:
+
+            bitvec = BitVector(bitstring = '10010011')
+            print(bitvec.rotated_left(3))           # 10011100
+            print(bitvec.rotated_right(3))          # 01110010
+            print(bitvec.shifted_left(3))           # 10011000
+            print(bitvec.shifted_right(3))          # 00010010
+            print(bitvec)                           # 10010011
+
+        The result is computed directly into the new bitvector, so there
+        is no need to make a deep copy before shifting.
+
+   @tag45
+   (45) view()
+
+        You can get at a range of the bits of a bitvector without copying
+        them by asking for a view:
+
+            bv = BitVector(hexstring = '4500003c1c4640004006')
+            header_length = bv.view(4, 8)
+            print(header_length)                    # 0101
+            print(int(header_length))               # 5
+            print(header_length.count_bits())       # 2
+
+        A view behaves like a read-only bitvector for indexing, slicing,
+        int(), str(), comparisons and the logical operators, and it tracks
+        any changes made to the bitvector it was taken from.  If you assign
+        to a bit or a slice of a view, the view first makes its own copy of
+        its bits, so the original bitvector is never changed through a view.
+        Call deep_copy() on a view to turn it into an ordinary BitVector.
+
+   @tag46
+   (46) to_bytes()
+
+        To hand the bits of a bitvector to anything that wants bytes, such
+        as a socket or a hash function, call
+
+            bv = BitVector(hexstring = 'f0a8')
+            data = bv.to_bytes()                   # b'\xf0\xa8'
+
+        The first bit of the bitvector becomes the most significant bit of
+        the first byte, and a final partial byte is padded with zeros on
+        the right.  In Python 3, bytes(bv) does the same, and in Python
+        3.12 and above, so does memoryview(bv).
+
+   @tag47
+   (47) iter_blocks()
+
+        To process all of a file or a stream in blocks of a fixed size, as
+        for a block cipher, you can iterate over it instead of checking
+        more_to_read in a loop:
+
+            with BitVector.iter_blocks('testinput4.txt', 64, pad=True) as blocks:
+                for bv in blocks:
+                    print(bv)
+
+        Each block is a new bitvector of 64 bits.  With pad=True, the last
+        block is padded with zeros on the right if the file ends before it
+        is full; otherwise the last block is just shorter.  Instead of a
+        file name you can also give any object with a read() method that
+        returns bytes, such as a pipe or a socket file, and the file is
+        never sought.  A file that iter_blocks() opened itself is closed at
+        the end of the with statement.
+
+   @tag48
+   (48) MappedBitVector
+
+        For a bitmap file too large to read into memory, you can construct
+        a MappedBitVector, which maps the file into memory with mmap:
+
+            with MappedBitVector('bitmap.bin') as bv:
+                print(bv[1000000])
+                print(bv.count_bits())
+                print(bv.next_set_bit(5000000))
+                print(bv[8:16])                    # a BitVector
+
+        The first bit of the file is the most significant bit of its first
+        byte, as with read_bits_from_file().  Creating a MappedBitVector
+        reads nothing; the operating system reads the pages of the file as
+        they are accessed.  The logical operators return ordinary
+        bitvectors.  If you construct it with writable=True, assigning to
+        its bits or slices and the in-place operators '^=', '&=' and '|='
+        change the file:
+
+            with MappedBitVector('bitmap.bin', writable=True) as bv:
+                bv[17] = 1
+                bv |= other                        # other must be of the same size
+
+        The changes are written to the file when you call flush() or
+        close(), or at the end of the with statement.
+
+   @tag49
+   (49) iter_set_bits()
+        iter_clear_bits()
+
+        Iterating over a bitvector with a for loop yields its bits lazily,
+        so even a very long bitvector can be scanned without creating a
+        list of all its bits.  When you only want the positions of the bits
+        that are set (or not set), call
+
+            bv = BitVector(bitstring = '0010010000001')
+            for i in bv.iter_set_bits():
+                print(i)                           # 2, 5, 12
+            print(list(bv.iter_clear_bits()))      # [0, 1, 3, 4, 6, ... 11]
+
+        Since the words in which no bit is set are skipped in one step,
+        iter_set_bits() is fast for sparse bitvectors.
+
+   @tag50
+   (50) CompressedBitVector
+
+        For bitmaps that are mostly 0's or mostly 1's, a compressed
+        bitvector stores only the positions at which the runs of 1's begin
+        and end:
+
+            bv = BitVector(size = 1000000)
+            bv[10] = bv[11] = bv[500000] = 1
+            cbv = CompressedBitVector(bitvector = bv)
+            print(cbv[11])                                  # 1
+            print(cbv.count_bits())                         # 3
+            print(cbv.next_set_bit(12))                     # 500000
+            print(cbv.to_bitvector() == bv)                 # True
+
+        The operators '&', '|', '^' and '~' work directly on compressed
+        bitvectors of the same size and return compressed bitvectors, and
+        the time they take depends on the number of runs of 1's rather than
+        on the number of bits.  You can also construct an all-zero
+        compressed bitvector with CompressedBitVector(size = n).  A
+        compressed bitvector cannot be changed once constructed; convert it
+        with to_bitvector() if you need to change its bits.
+
 
 @title
 HOW THE BIT VECTORS ARE STORED:
 
-    The bits of a bit vector are stored in 16-bit unsigned ints
-    following Josiah Carlson's recommendation to that effect on the
-    Pyrex mailing list.  As you can see in the code for `__init__()',
-    after resolving the argument with which the constructor is called,
-    the very first thing the constructor does is to figure out how many
-    of those 2-byte ints it needs for the bits (see how the value is
-    assigned to the variable `two_byte_ints_needed' toward the end of
-    `__init__()').  For example, if you wanted to store a 64-bit array,
-    the variable 'two_byte_ints_needed' would be set to 4. (This does
-    not mean that the size of a bit vector must be a multiple of 16.
-    Any sized bit vectors can be constructed --- the constructor will
-    choose the minimum number of two-byte ints needed.) Subsequently,
-    the constructor acquires an array of zero-initialized 2-byte ints.
-    The last thing that is done in the code for `__init__()' is to
-    shift the bits into the array of two-byte ints.
+    The bits of a bit vector are stored in 64-bit unsigned ints.  (The
+    early versions of this module used 16-bit unsigned ints following
+    Josiah Carlson's recommendation to that effect on the Pyrex mailing
+    list.  Switching to 64-bit words means that the word-level methods,
+    such as those for the logical operators and for counting the bits,
+    have only a quarter as many elements to process.)  As you can see in
+    the code for `__init__()', after resolving the argument with which
+    the constructor is called, the very first thing the constructor
+    does is to figure out how many of those 8-byte ints it needs for the
+    bits.  For example, if you wanted to store a 200-bit array, the
+    constructor would acquire 4 such ints. (This does not mean that the
+    size of a bit vector must be a multiple of 64.  Any sized bit
+    vectors can be constructed --- the constructor will choose the
+    minimum number of words needed.) Subsequently, the constructor
+    acquires an array of zero-initialized words.  The last thing that
+    is done in the code for `__init__()' is to shift the bits into the
+    array of words.  The bit at index i of a bit vector is stored at
+    the bit position i % 64 in the word indexed i // 64.  On platforms
+    whose `array' module does not support 64-bit unsigned ints, the
+    native unsigned long is used instead.
 
     As mentioned above, note that it is not necessary for the size of a
-    bit vector to be a multiple of 16 even though we are using C's
-    unsigned short as as a basic unit for storing the bit arrays.  The
+    bit vector to be a multiple of 64 even though we are using 64-bit
+    unsigned ints as the basic unit for storing the bit arrays.  The
     class BitVector keeps track of the actual number of bits in the bit
-    vector through the "size" instance variable.
+    vector through the "size" instance variable.  The unused bits in the
+    last word are always kept at zero.
+
+    For operations that involve all of the bits at once, such as the
+    logical operators, the words are converted into a single Python
+    integer whose bit at position i is the bit at index i of the bit
+    vector.  The operation itself is then a single call into Python's
+    arbitrary-precision integer arithmetic and the result is converted
+    back into words.  Since converting the words into an integer is the
+    more expensive of the two conversions, the integer is cached with
+    the bit vector until its bits are changed.  The bit vectors returned
+    by the logical operators come with this integer already in place,
+    so chained operations such as `bv1 & bv2 | bv3' only pay for the
+    conversion once per operand.
 
     Note that, except for one case, the constructor must be called with
     a single keyword argument, which determines how the bit vector will
@@ -1511,53 +1774,166 @@ SOME EXAMPLE CODE:
 
 
 import array
-import operator
+import binascii
+import bisect
+import itertools
+import mmap
 import sys
 
-_hexdict = {'0': '0000', '1': '0001', '2': '0010', '3': '0011',
-            '4': '0100', '5': '0101', '6': '0110', '7': '0111',
-            '8': '1000', '9': '1001', 'a': '1010', 'b': '1011',
-            'c': '1100', 'd': '1101', 'e': '1110', 'f': '1111'}
+# The bits are packed into unsigned 64-bit words.  Older Pythons do not
+# support the 'Q' typecode, in which case we fall back on the native
+# unsigned long.
+try:
+    array.array('Q')
+    _WORD_TYPECODE = 'Q'
+except ValueError:
+    _WORD_TYPECODE = 'L'
+_WORD_BITS = array.array(_WORD_TYPECODE).itemsize * 8
+_WORD_MASK = (1 << _WORD_BITS) - 1
+
+# How many bytes at a time are read from a file by read_bits_from_file():
+_READAHEAD_BYTES = 1 << 16
+
+# How many bytes of a memory-mapped file are processed at a time:
+_MAPPED_CHUNK_BYTES = 1 << 20
+
+# The largest number of bytes handed to a single write() by write_to_file():
+_WRITE_CHUNK_BYTES = 1 << 20
+
+# The bits are stored with index 0 at the least significant end of the words,
+# whereas index 0 is the most significant bit of the integer value of a bit
+# vector.  Translating bytes through this table reverses the bits in each:
+_REVERSED_BYTES = bytes(bytearray(int('{0:08b}'.format(i)[::-1], 2)
+                                  for i in range(256)))
+
+# The bits of each byte value in index order, that is, least significant bit
+# first, for iterating over the bytes of the words:
+_BYTE_BITS = [tuple((i >> j) & 1 for j in range(8)) for i in range(256)]
+
+# How many words at a time are unpacked into bits by a BitVectorIterator:
+_ITER_CHUNK_WORDS = 1024
+
+# The number of words in each block and in each superblock of the
+# rank/select directory:
+_RANK_BLOCK_WORDS = 8
+_RANK_SUPERBLOCK_WORDS = 64
 
 
 def _readblock(blocksize, bitvector):
     '''
-    If this function succeeds in reading all blocksize bits, it uses the
-    tell-read-seek mechanism to peek ahead to see if there is anything more to be
-    read in the file. If there is nothing further to be read, it sets the more_to_read
-    attribute of the BitVector instance to False.  Obviously, this can only be done for
-    seekable streams such as those connected with disk files.  According to Blair
-    Houghton, a similar feature could presumably be implemented for socket streams by
-    using recv() or recvfrom() if you set the flags argument to MSG_PEEK.
+    Returns the next blocksize/8 bytes of the file object FILEIN of the
+    bitvector, or fewer bytes if the file runs out before that.  The file is
+    read into the read-ahead buffer _readahead of the bitvector, whose first
+    _readahead_pos bytes have already been returned.  The function always
+    keeps at least one byte beyond the block in the buffer if the file has
+    one, so it can tell without the old tell-read-seek peek whether there is
+    anything more to be read in the file.  If there is nothing further to be
+    read, it sets the more_to_read attribute of the BitVector instance to
+    False.  Since nothing is ever sought, this works just as well for pipes
+    and sockets as for disk files, but a block is only returned once the
+    byte after it has arrived or the file has ended.  (The iterator returned
+    by iter_blocks() does not need this lookahead and has its own read.)  On
+    buffered files, read1() takes up to _READAHEAD_BYTES of whatever is
+    already available; otherwise only the missing bytes are asked for.
     '''
-    bitstring = ''
-    i = 0
-    while (i < blocksize / 8):
-        i += 1
-        byte = bitvector.FILEIN.read(1)
-        if byte == b'':
-            if len(bitstring) < blocksize:
-                bitvector.more_to_read = False
-            return bitstring
-        if sys.version_info[0] == 3:
-            hexvalue = '%02x' % byte[0]
-        else:
-            hexvalue = hex(ord(byte))
-            hexvalue = hexvalue[2:]
-            if len(hexvalue) == 1:
-                hexvalue = '0' + hexvalue
-        bitstring += _hexdict[hexvalue[0]]
-        bitstring += _hexdict[hexvalue[1]]
-    file_pos = bitvector.FILEIN.tell()
-    # peek at the next byte; moves file position only if a
-    # byte is read
-    next_byte = bitvector.FILEIN.read(1)
-    if next_byte:
-        # pretend we never read the byte
-        bitvector.FILEIN.seek(file_pos)
-    else:
+    nbytes = blocksize // 8
+    buf = bitvector._readahead
+    pos = bitvector._readahead_pos
+    if len(buf) - pos <= nbytes:
+        buf = buf[pos:]
+        pos = 0
+        read1 = getattr(bitvector.FILEIN, 'read1', None)
+        while len(buf) <= nbytes:
+            if read1 is not None:
+                chunk = read1(max(nbytes + 1 - len(buf), _READAHEAD_BYTES))
+            else:
+                chunk = bitvector.FILEIN.read(nbytes + 1 - len(buf))
+            if not chunk:
+                break
+            buf += chunk
+    block = buf[pos:pos + nbytes]
+    pos += len(block)
+    if pos == len(buf):
         bitvector.more_to_read = False
-    return bitstring
+    bitvector._readahead = buf
+    bitvector._readahead_pos = pos
+    return block
+
+
+if hasattr(int, 'bit_count'):
+    def _popcount(value):
+        'The number of bits set in a nonnegative integer'
+        return value.bit_count()
+else:
+    def _popcount(value):
+        'The number of bits set in a nonnegative integer'
+        return bin(value).count('1')
+
+
+def _stepped_bounds(start, stop, step):
+    '''
+    Return the (lo, hi) pair for which range(lo, hi) covers all of the
+    indices of range(start, stop, step), or None if there are none.  The
+    bounds are computed directly, since range() on Python 2 builds a list.
+    '''
+    if step > 0:
+        count = (stop - start + step - 1) // step
+    else:
+        count = (start - stop - step - 1) // -step
+    if count <= 0:
+        return None
+    last = start + (count - 1) * step
+    return min(start, last), max(start, last) + 1
+
+
+def _zero_words(nbits):
+    'Return a zero-initialized array of words large enough for nbits bits'
+    return array.array(_WORD_TYPECODE, [0]) * ((nbits + _WORD_BITS - 1) // _WORD_BITS)
+
+
+def _words_to_bytes(words):
+    'Return the little-endian byte representation of an array of words'
+    if sys.byteorder == 'big':
+        words = array.array(_WORD_TYPECODE, words)
+        words.byteswap()
+    if sys.version_info[0] == 3:
+        return words.tobytes()
+    else:
+        return words.tostring()
+
+
+def _words_from_bytes(data):
+    'Inverse of _words_to_bytes(); len(data) must be a multiple of the word size'
+    words = array.array(_WORD_TYPECODE)
+    if sys.version_info[0] == 3:
+        words.frombytes(data)
+    else:
+        words.fromstring(data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
+
+
+if sys.version_info[0] == 3:
+    def _int_from_bytes(data, byteorder):
+        return int.from_bytes(data, byteorder)
+
+    def _int_to_bytes(value, length, byteorder):
+        return value.to_bytes(length, byteorder)
+else:
+    def _int_from_bytes(data, byteorder):
+        if byteorder == 'little':
+            data = data[::-1]
+        return int(binascii.hexlify(data) or '0', 16)
+
+    def _int_to_bytes(value, length, byteorder):
+        if length == 0:
+            return b''
+        # The width given to '*' must be an int, not a long:
+        data = binascii.unhexlify('%0*x' % (int(2 * length), value))
+        if byteorder == 'little':
+            data = data[::-1]
+        return data
 
 
 #------------------------------  BitVector Class Definition   ------------
@@ -1600,6 +1976,9 @@ class BitVector(object):
         self.size = 0
         self.FILEIN = None
         self.FILEOUT = None
+        self._packed_int = None
+        self._hash = None
+        self._rank_index = None
         if filename:
             if fp or size or intVal or bitlist or bitstring or hexstring or textstring or rawbytes:
                 raise ValueError('''When filename is specified, you cannot give values
@@ -1607,6 +1986,8 @@ class BitVector(object):
             self.filename = filename
             self.FILEIN = open(filename, 'rb')
             self.more_to_read = True
+            self._readahead = b''
+            self._readahead_pos = 0
             return
         elif fp:
             if filename or size or intVal or bitlist or bitstring or hexstring or \
@@ -1620,58 +2001,24 @@ class BitVector(object):
             if filename or fp or bitlist or bitstring or hexstring or textstring or rawbytes:
                 raise ValueError('''When intVal is specified, you can only give a
                                     value to the 'size' constructor arg''')
-            if intVal == 0:
-                bitlist = [0]
-                if size is None:
-                    self.size = 1
-                elif size == 0:
-                    raise ValueError('''The value specified for size must be at least
-                                        as large as for the smallest bit vector possible
-                                        for intVal''')
-                else:
-                    if size < len(bitlist):
-                        raise ValueError('''The value specified for size must be at least
-                                            as large as for the smallest bit vector
-                                            possible for intVal''')
-                    n = size - len(bitlist)
-                    bitlist = [0] * n + bitlist
-                    self.size = len(bitlist)
-            else:
-                hexVal = hex(intVal).lower().rstrip('l')
-                hexVal = hexVal[2:]
-                if len(hexVal) == 1:
-                    hexVal = '0' + hexVal
-                bitlist = ''.join(map(lambda x: _hexdict[x], hexVal))
-                bitlist = list(map(int, bitlist))
-                i = 0
-                while (i < len(bitlist)):
-                    if bitlist[i] == 1:
-                        break
-                    i += 1
-                del bitlist[0:i]
-                if size is None:
-                    self.size = len(bitlist)
-                elif size == 0:
-                    if size < len(bitlist):
-                        raise ValueError('''The value specified for size must be at least
-                                            as large as for the smallest bit vector possible
-                                            for intVal''')
-                else:
-                    if size < len(bitlist):
-                        raise ValueError('''The value specified for size must be at least
-                                            as large as for the smallest bit vector possible
-                                            for intVal''')
-                    n = size - len(bitlist)
-                    bitlist = [0] * n + bitlist
-                    self.size = len(bitlist)
+            nbits = max(intVal.bit_length(), 1)
+            if size is None:
+                size = nbits
+            elif size < nbits:
+                raise ValueError('''The value specified for size must be at least
+                                    as large as for the smallest bit vector possible
+                                    for intVal''')
+            nbytes = (size + 7) // 8
+            self._load_bytes(_int_to_bytes(intVal << (8 * nbytes - size), nbytes,
+                                           'big'), size)
+            return
         elif size is not None and size >= 0:
             if filename or fp or intVal or bitlist or bitstring or hexstring or \
                     textstring or rawbytes:
                 raise ValueError('''When size is specified (without an intVal), you cannot
                                     give values to any other constructor args''')
             self.size = size
-            two_byte_ints_needed = (size + 15) // 16
-            self.vector = array.array('H', [0] * two_byte_ints_needed)
+            self.vector = _zero_words(size)
             return
         elif bitstring or bitstring == '':
             if filename or fp or size or intVal or bitlist or hexstring or textstring or rawbytes:
@@ -1688,37 +2035,52 @@ class BitVector(object):
             if filename or fp or size or intVal or bitlist or bitstring or hexstring or rawbytes:
                 raise ValueError('''When bits are specified through textstring, you
                                     cannot give values to any other constructor args''')
-            hexlist = ''.join(map(lambda x: x[2:], map(lambda x: hex(x) if len(hex(x)[2:]) == 2
-                                                       else hex(x)[:2] + '0' + hex(x)[2:], map(ord, list(textstring)))))
-            bitlist = list(
-                map(int, list(''.join(map(lambda x: _hexdict[x], list(hexlist))))))
-            self.size = len(bitlist)
+            if isinstance(textstring, bytes):
+                self._load_bytes(textstring, 8 * len(textstring))
+                return
+            try:
+                data = textstring.encode('latin-1')
+            except UnicodeError:
+                # Characters beyond '\xff' do not fit in a byte.  They get
+                # the hex digits they need plus a leading '0', so the bits
+                # are obtained from the hex digits instead:
+                hexstring = ''.join('%02x' % c if c < 256 else '0%x' % c
+                                    for c in map(ord, textstring))
+                self._load_bytes(binascii.unhexlify(hexstring + '0' * (len(hexstring) % 2)),
+                                 4 * len(hexstring))
+                return
+            self._load_bytes(data, 8 * len(data))
+            return
         elif hexstring or hexstring == '':
             if filename or fp or size or intVal or bitlist or bitstring or textstring or rawbytes:
                 raise ValueError('''When bits are specified through hexstring, you
                                     cannot give values to any other constructor args''')
-            bitlist = list(
-                map(int, list(''.join(map(lambda x: _hexdict[x], list(hexstring.lower()))))))
-            self.size = len(bitlist)
+            self._load_bytes(binascii.unhexlify(hexstring + '0' * (len(hexstring) % 2)),
+                             4 * len(hexstring))
+            return
         elif rawbytes:
             if filename or fp or size or intVal or bitlist or bitstring or textstring or hexstring:
                 raise ValueError('''When bits are specified through rawbytes, you
                                     cannot give values to any other constructor args''')
-            import binascii
-            hexlist = binascii.hexlify(rawbytes)
-            if sys.version_info[0] == 3:
-                bitlist = list(map(int, list(''.join(map(lambda x: _hexdict[x],
-                                                         list(map(chr, list(hexlist))))))))
-            else:
-                bitlist = list(
-                    map(int, list(''.join(map(lambda x: _hexdict[x], list(hexlist))))))
-            self.size = len(bitlist)
+            self._load_bytes(rawbytes, 8 * len(rawbytes))
+            return
         else:
             raise ValueError("wrong arg(s) for constructor")
-        two_byte_ints_needed = (len(bitlist) + 15) // 16
-        self.vector = array.array('H', [0] * two_byte_ints_needed)
+        self.vector = _zero_words(len(bitlist))
         list(map(self._setbit, range(len(bitlist)), bitlist))
 
+    def _load_bytes(self, data, size):
+        '''
+        Give the bit vector the designated size and take its bits from a byte
+        string in which index 0 is the most significant bit of the first
+        byte, as in a file or a network packet.  Any bits of the bytes at
+        positions beyond the size must be zero.
+        '''
+        self.size = size
+        data = bytes(data).translate(_REVERSED_BYTES)
+        data += b'\0' * (-len(data) % (_WORD_BITS // 8))
+        self.vector = _words_from_bytes(data)
+
     def _setbit(self, posn, val):
         'Set the bit at the designated position to the value shown'
         if val not in (0, 1):
@@ -1729,11 +2091,57 @@ class BitVector(object):
             raise ValueError("index range error")
         if posn < 0:
             posn = self.size + posn
-        block_index = posn // 16
-        shift = posn & 15
+        block_index = posn // _WORD_BITS
+        shift = posn % _WORD_BITS
         cv = self.vector[block_index]
         if (cv >> shift) & 1 != val:
             self.vector[block_index] = cv ^ (1 << shift)
+            self._packed_int = None
+            self._hash = None
+            self._rank_index = None
+
+    def _get_packed_int(self):
+        '''
+        Return all the bits of the bit vector packed into a single integer,
+        with the bit at index i of the bit vector at bit position i of the
+        integer.  This allows whole-vector operations to be carried out by
+        Python's arbitrary-precision integer arithmetic instead of word by
+        word.  Since the conversion from the words is the expensive part of
+        such operations, the integer is cached until the bits are changed.
+        Any method that changes the words in place must therefore reset the
+        _packed_int attribute to None, and the _hash and _rank_index
+        attributes along with it.
+        '''
+        if self._packed_int is None:
+            self._packed_int = _int_from_bytes(
+                _words_to_bytes(self.vector), 'little')
+        return self._packed_int
+
+    def _set_packed_int(self, value):
+        '''
+        The inverse of _get_packed_int().  The value must not have any bits set
+        at positions beyond the size of the bit vector.
+        '''
+        words_needed = (self.size + _WORD_BITS - 1) // _WORD_BITS
+        self.vector = _words_from_bytes(
+            _int_to_bytes(value, words_needed * (_WORD_BITS // 8), 'little'))
+        self._packed_int = value
+        self._hash = None
+        self._rank_index = None
+
+    def _align_with(self, other):
+        '''
+        For the binary logical operators.  Returns the size of the longer of the
+        two bit vectors together with the packed integers for both of them, the
+        shorter one having been padded with zeros from the left.
+        '''
+        self_int = self._get_packed_int()
+        other_int = other._get_packed_int()
+        if self.size < other.size:
+            self_int <<= other.size - self.size
+        elif self.size > other.size:
+            other_int <<= self.size - other.size
+        return max(self.size, other.size), self_int, other_int
 
     def _getbit(self, pos):
         'Get the bit from the designated position'
@@ -1742,20 +2150,80 @@ class BitVector(object):
                 raise ValueError("index range error")
             if pos < 0:
                 pos = self.size + pos
-            return (self.vector[pos // 16] >> (pos & 15)) & 1
+            return (self.vector[pos // _WORD_BITS] >> (pos % _WORD_BITS)) & 1
         else:
-            bitstring = ''
-            if pos.start is None:
-                start = 0
-            else:
-                start = pos.start
-            if pos.stop is None:
-                stop = self.size
-            else:
-                stop = pos.stop
-            for i in range(start, stop):
-                bitstring += str(self[i])
-            return BitVector(bitstring=bitstring)
+            start, stop, step = pos.indices(self.size)
+            if step != 1:
+                return self._get_stepped_bits(start, stop, step)
+            res = BitVector(size=max(stop - start, 0))
+            res._set_packed_int(self._get_packed_bits(start, res.size))
+            return res
+
+    def _get_stepped_bits(self, start, stop, step):
+        '''
+        Return a new bit vector made of the bits at the indices of
+        range(start, stop, step) for a step other than 1.  Only the bits
+        between the first and the last of those indices are looked at.
+        '''
+        bounds = _stepped_bounds(start, stop, step)
+        if bounds is None:
+            return BitVector(size=0)
+        lo, hi = bounds
+        # Let string slicing pick out the bits of the covered range:
+        bits = self._get_bits_in_index_order(lo, hi - lo)[start - lo::step]
+        res = BitVector(size=len(bits))
+        res._set_packed_int(int(bits[::-1], 2))
+        return res
+
+    def _get_packed_bits(self, start, length):
+        '''
+        Return the packed integer for the length bits that begin at index
+        start.  Only the words that hold those bits are looked at.
+        '''
+        if length <= 0:
+            return 0
+        first = start // _WORD_BITS
+        last = (start + length - 1) // _WORD_BITS
+        value = _int_from_bytes(
+            _words_to_bytes(self.vector[first:last + 1]), 'little')
+        return (value >> (start % _WORD_BITS)) & ((1 << length) - 1)
+
+    def _set_packed_bits(self, start, length, value):
+        '''
+        Overwrite the length bits that begin at index start with the bits of
+        the packed integer value.  Only the words that hold those bits are
+        rewritten.
+        '''
+        if length <= 0:
+            return
+        first = start // _WORD_BITS
+        last = (start + length - 1) // _WORD_BITS
+        offset = start % _WORD_BITS
+        mask = ((1 << length) - 1) << offset
+        old = _int_from_bytes(
+            _words_to_bytes(self.vector[first:last + 1]), 'little')
+        new = (old & ~mask) | (value << offset)
+        self.vector[first:last + 1] = _words_from_bytes(
+            _int_to_bytes(new, (last - first + 1) * (_WORD_BITS // 8), 'little'))
+        self._packed_int = None
+        self._hash = None
+        self._rank_index = None
+
+    def _get_bits_in_index_order(self, start=0, length=None):
+        '''
+        Return a string of 0s and 1s in which character i is the bit at index
+        start + i, for the length bits from start on (all of the bits by
+        default).
+        '''
+        if length is None:
+            length = self.size - start
+        if length <= 0:
+            return ''
+        if start == 0 and length == self.size:
+            packed = self._get_packed_int()
+        else:
+            packed = self._get_packed_bits(start, length)
+        return format(packed, '0%db' % length)[::-1]
 
     def __xor__(self, other):
         '''
@@ -1764,18 +2232,9 @@ class BitVector(object):
         bit vectors are not of the same size, pad the shorter one with zeros from the
         left.
         '''
-        if self.size < other.size:
-            bv1 = self._resize_pad_from_left(other.size - self.size)
-            bv2 = other
-        elif self.size > other.size:
-            bv1 = self
-            bv2 = other._resize_pad_from_left(self.size - other.size)
-        else:
-            bv1 = self
-            bv2 = other
-        res = BitVector(size=bv1.size)
-        lpb = map(operator.__xor__, bv1.vector, bv2.vector)
-        res.vector = array.array('H', lpb)
+        size, self_int, other_int = self._align_with(other)
+        res = BitVector(size=size)
+        res._set_packed_int(self_int ^ other_int)
         return res
 
     def __and__(self, other):
@@ -1785,18 +2244,9 @@ class BitVector(object):
         bit vectors are not of the same size, pad the shorter one with zeros from the
         left.
         '''
-        if self.size < other.size:
-            bv1 = self._resize_pad_from_left(other.size - self.size)
-            bv2 = other
-        elif self.size > other.size:
-            bv1 = self
-            bv2 = other._resize_pad_from_left(self.size - other.size)
-        else:
-            bv1 = self
-            bv2 = other
-        res = BitVector(size=bv1.size)
-        lpb = map(operator.__and__, bv1.vector, bv2.vector)
-        res.vector = array.array('H', lpb)
+        size, self_int, other_int = self._align_with(other)
+        res = BitVector(size=size)
+        res._set_packed_int(self_int & other_int)
         return res
 
     def __or__(self, other):
@@ -1806,18 +2256,9 @@ class BitVector(object):
         vectors are not of the same size, pad the shorter one with zero's from the
         left.
         '''
-        if self.size < other.size:
-            bv1 = self._resize_pad_from_left(other.size - self.size)
-            bv2 = other
-        elif self.size > other.size:
-            bv1 = self
-            bv2 = other._resize_pad_from_left(self.size - other.size)
-        else:
-            bv1 = self
-            bv2 = other
-        res = BitVector(size=bv1.size)
-        lpb = map(operator.__or__, bv1.vector, bv2.vector)
-        res.vector = array.array('H', lpb)
+        size, self_int, other_int = self._align_with(other)
+        res = BitVector(size=size)
+        res._set_packed_int(self_int | other_int)
         return res
 
     def __invert__(self):
@@ -1826,12 +2267,56 @@ class BitVector(object):
         and return the result as a new bit vector.
         '''
         res = BitVector(size=self.size)
-        lpb = list(map(operator.__inv__, self.vector))
-        res.vector = array.array('H')
-        for i in range(len(lpb)):
-            res.vector.append(lpb[i] & 0x0000FFFF)
+        res._set_packed_int(self._get_packed_int() ^ ((1 << self.size) - 1))
         return res
 
+    def xor_into(self, other):
+        '''
+        You can XOR the bits of the argument bit vector into the bit vector on
+        which the method is invoked without creating a new bit vector:
+
+            bv1 = BitVector(bitstring = '0011')
+            bv2 = BitVector(bitstring = '0101')
+            bv1.xor_into(bv2)
+            print(bv1)                                  # 0110
+
+        The same is accomplished by the statement bv1 ^= bv2.  This method
+        returns the bit vector on which it is invoked.  If the argument bit
+        vector is longer, the bit vector on which the method is invoked is
+        first padded with zeros from the left, as for the '^' operator.
+        '''
+        size, self_int, other_int = self._align_with(other)
+        self.size = size
+        self._set_packed_int(self_int ^ other_int)
+        return self
+
+    def and_into(self, other):
+        '''
+        In-place version of the '&' operator.  The call bv1.and_into(bv2) is the
+        same as the statement bv1 &= bv2.  This method returns the bit vector on
+        which it is invoked.
+        '''
+        size, self_int, other_int = self._align_with(other)
+        self.size = size
+        self._set_packed_int(self_int & other_int)
+        return self
+
+    def or_into(self, other):
+        '''
+        In-place version of the '|' operator.  The call bv1.or_into(bv2) is the
+        same as the statement bv1 |= bv2.  This method returns the bit vector on
+        which it is invoked.
+        '''
+        size, self_int, other_int = self._align_with(other)
+        self.size = size
+        self._set_packed_int(self_int | other_int)
+        return self
+
+    # Allow the augmented assignments ^=, &= and |= to work in place:
+    __ixor__ = xor_into
+    __iand__ = and_into
+    __ior__ = or_into
+
     def __add__(self, other):
         '''
         Because __add__ is supplied, you can always join two bitvectors by
@@ -1897,11 +2382,37 @@ class BitVector(object):
             raise SyntaxError(error_str)
         if blocksize % 8 != 0:
             raise ValueError("block size must be a multiple of 8")
-        bitstr = _readblock(blocksize, self)
-        if len(bitstr) == 0:
+        data = _readblock(blocksize, self)
+        if len(data) == 0:
             return BitVector(size=0)
         else:
-            return BitVector(bitstring=bitstr)
+            return BitVector(rawbytes=data)
+
+    @staticmethod
+    def iter_blocks(source, blocksize, pad=False):
+        '''
+        You can iterate over the bits of a file in blocks of blocksize bits
+        with
+
+            with BitVector.iter_blocks('somefile', 64, pad=True) as blocks:
+                for bv in blocks:
+                    ...
+
+        The source can be the name of a file or any object with a read()
+        method that returns bytes, such as an open file, sys.stdin.buffer,
+        a pipe or the file object returned by socket.makefile('rb').  Since
+        the file is never sought, its size need not be known in advance,
+        and at most one block plus a 64 KB read-ahead buffer is held in
+        memory at any time.  Unless pad is True, the last bitvector is
+        shorter than blocksize if the file ends before that block is full.
+        With pad=True, the last bitvector is padded with zeros on the right
+        to blocksize bits.  The block size must be a multiple of 8.
+
+        The iterator closes the file at the end of a with statement or
+        when you call its close() method, but only if it opened the file
+        itself, that is, if you gave it the name of a file.
+        '''
+        return BitVectorBlockIterator(source, blocksize, pad)
 
     def read_bits_from_fileobject(self, fp):
         '''
@@ -1935,19 +2446,14 @@ class BitVector(object):
         especially if you use the StringIO class, as shown in the test
         code.
         '''
-        for bit_index in range(self.size):
-            # For Python 3.x:
-            if sys.version_info[0] == 3:
-                if self[bit_index] == 0:
-                    fp.write(str('0'))
-                else:
-                    fp.write(str('1'))
-            # For Python 2.x:
-            else:
-                if self[bit_index] == 0:
-                    fp.write(unicode('0'))
-                else:
-                    fp.write(unicode('1'))
+        if self.size == 0:
+            return
+        # For Python 3.x:
+        if sys.version_info[0] == 3:
+            fp.write(str(self))
+        # For Python 2.x:
+        else:
+            fp.write(unicode(str(self)))
 
     def divide_into_two(self):
         '''
@@ -1962,17 +2468,7 @@ class BitVector(object):
         '''
         if self.size % 2 != 0:
             raise ValueError("must have even num bits")
-        i = 0
-        outlist1 = []
-        while (i < self.size / 2):
-            outlist1.append(self[i])
-            i += 1
-        outlist2 = []
-        while (i < self.size):
-            outlist2.append(self[i])
-            i += 1
-        return [BitVector(bitlist=outlist1),
-                BitVector(bitlist=outlist2)]
+        return [self[:self.size // 2], self[self.size // 2:]]
 
     def permute(self, permute_list):
         '''
@@ -2044,14 +2540,54 @@ class BitVector(object):
             self.FILEOUT = file_out
         if self.size % 8:
             raise ValueError(err_str)
-        for byte in range(int(self.size / 8)):
-            value = 0
-            for bit in range(8):
-                value += (self._getbit(byte * 8 + (7 - bit)) << bit)
-            if sys.version_info[0] == 3:
-                file_out.write(bytes(chr(value), 'utf-8'))
-            else:
-                file_out.write(chr(value))
+        # Convert and write the words a chunk at a time, so that no copy of
+        # all of the bytes is ever made:
+        word_bytes = _WORD_BITS // 8
+        chunk_words = _WRITE_CHUNK_BYTES // word_bytes
+        remaining = self.size // 8
+        for first in range(0, len(self.vector), chunk_words):
+            data = _words_to_bytes(self.vector[first:first + chunk_words])
+            if len(data) > remaining:
+                data = data[:remaining]
+            file_out.write(data.translate(_REVERSED_BYTES))
+            remaining -= len(data)
+
+    @staticmethod
+    def write_bitvectors_to_file(file_out, bitvectors):
+        '''
+        When you have many bitvectors to write out one after another, as
+        the output blocks of a block cipher, you can write them all with
+        a single call:
+
+            FILEOUT = open('output.bits', 'wb')
+            BitVector.write_bitvectors_to_file(FILEOUT, encrypted_blocks)
+            FILEOUT.close()
+
+        The bitvectors can come from any iterable, including a generator.
+        Their bytes are collected and written out a megabyte at a time,
+        which saves a write() call per bitvector.  As with write_to_file(),
+        the size of each bitvector must be a multiple of 8; a ValueError is
+        raised at the first one that is not, after everything before it has
+        been written.
+        '''
+        pending = []
+        pending_bytes = 0
+        try:
+            for bitvec in bitvectors:
+                if bitvec.size % 8:
+                    raise ValueError('''Only a bit vector whose length is a multiple of 8 can
+                        be written to a file.  Use the padding functions to satisfy
+                        this constraint.''')
+                data = bitvec.to_bytes()
+                pending.append(data)
+                pending_bytes += len(data)
+                if pending_bytes >= _WRITE_CHUNK_BYTES:
+                    file_out.write(b''.join(pending))
+                    pending = []
+                    pending_bytes = 0
+        finally:
+            if pending:
+                file_out.write(b''.join(pending))
 
     def close_file_object(self):
         '''
@@ -2073,13 +2609,43 @@ class BitVector(object):
 
     def int_val(self):
         'Return the integer value of a bitvector'
-        intVal = 0
-        for i in range(self.size):
-            intVal += self[i] * (2 ** (self.size - i - 1))
-        return intVal
+        # With the bits of every byte reversed, the bytes of the words read
+        # as a big-endian integer have index 0 as their most significant
+        # bit.  All that remains is to drop the unused bits of the last word.
+        data = _words_to_bytes(self.vector).translate(_REVERSED_BYTES)
+        return _int_from_bytes(data, 'big') >> (len(data) * 8 - self.size)
 
     intValue = int_val
 
+    def to_bytes(self):
+        '''
+        You can get the bits of a bitvector as a byte string, with index 0
+        as the most significant bit of the first byte, by
+
+            bv = BitVector(bitstring = '1111000010101')
+            data = bv.to_bytes()
+            print(repr(data))                      # b'\xf0\xa8'
+
+        If the size of the bitvector is not a multiple of 8, the last byte
+        is padded with zeros on the right.  This is the bit order in which
+        the rawbytes constructor option reads the bytes, so
+
+            BitVector(rawbytes = bv.to_bytes())
+
+        gives back bv if its size is a multiple of 8.  Calling bytes(bv) in
+        Python 3 and memoryview(bv) in Python 3.12 and above return the same
+        bytes, so you can hand a bitvector directly to sockets, hashlib and
+        the like.
+        '''
+        data = _words_to_bytes(self.vector).translate(_REVERSED_BYTES)
+        return data[:(self.size + 7) // 8]
+
+    __bytes__ = to_bytes
+
+    def __buffer__(self, flags):
+        'Supports memoryview(bv) in Python 3.12 and above'
+        return memoryview(self.to_bytes())
+
     def get_bitvector_in_ascii(self):
         '''
         You can call get_bitvector_in_ascii() to directly convert a bit
@@ -2100,13 +2666,16 @@ class BitVector(object):
         if self.size % 8:
             raise ValueError('''\nThe bitvector for get_bitvector_in_ascii()
                                   must be an integral multiple of 8 bits''')
-        return ''.join(map(chr, map(int, [self[i:i + 8] for i in range(0, self.size, 8)])))
+        if sys.version_info[0] == 3:
+            return self.to_bytes().decode('latin-1')
+        else:
+            return self.to_bytes()
 
     # For backward compatibility:
     get_text_from_bitvector = get_bitvector_in_ascii
     getTextFromBitVector = get_bitvector_in_ascii
 
-    def get_bitvector_in_hex(self):
+    def get_bitvector_in_hex(self, pad=False):
         '''
         You can directly convert a bit vector into a hex string (this is a
         useful thing to do only if the length of the vector is an integral
@@ -2118,20 +2687,50 @@ class BitVector(object):
             print myhexstring                      # 68656c6c6
 
         This method throws an exception if the size of the bitvector is not
-        a multiple of 4.  The method returns a string that is formed by
-        scanning the bits from the left and replacing each sequence of 4
-        bits by its corresponding hex digit.
+        a multiple of 4, unless you call it with pad=True, in which case the
+        last hex digit is formed by padding the last bits with zeros on the
+        right.  The method returns a string that is formed by scanning the
+        bits from the left and replacing each sequence of 4 bits by its
+        corresponding hex digit.
         '''
-        if self.size % 4:
+        if self.size % 4 and not pad:
             raise ValueError('''\nThe bitvector for get_bitvector_in_hex()
                                   must be an integral multiple of 4 bits''')
-        return ''.join(map(lambda x: x.replace('0x', ''),
-                           map(hex, map(int, [self[i:i + 4] for i in range(0, self.size, 4)]))))
+        hexstring = binascii.hexlify(self.to_bytes())
+        if sys.version_info[0] == 3:
+            hexstring = hexstring.decode('ascii')
+        # to_bytes() pads to a whole number of bytes, which may have added
+        # one hex digit too many:
+        return hexstring[:(self.size + 3) // 4]
 
     # For backward compatibility:
     get_hex_string_from_bitvector = get_bitvector_in_hex
     getHexStringFromBitVector = get_bitvector_in_hex
 
+    def _rotated_int(self, n):
+        '''
+        Return the packed integer for the bit vector circularly rotated to the
+        left by n positions.  A negative n rotates to the right.
+        '''
+        if self.size == 0:
+            raise ValueError('''Circular shift of an empty vector
+                                makes no sense''')
+        n %= self.size
+        value = self._get_packed_int()
+        return ((value >> n) | (value << (self.size - n))) & ((1 << self.size) - 1)
+
+    def _shifted_int(self, n):
+        '''
+        Return the packed integer for the bit vector shifted non-circularly to
+        the left by n positions.  A negative n shifts to the right.
+        '''
+        if abs(n) >= self.size:
+            return 0
+        value = self._get_packed_int()
+        if n >= 0:
+            return value >> n
+        return (value << -n) & ((1 << self.size) - 1)
+
     def __lshift__(self, n):
         '''
         Left circular rotation of a BitVector through N positions can be
@@ -2145,13 +2744,7 @@ class BitVector(object):
         invocation of the operator
 
         '''
-        if self.size == 0:
-            raise ValueError('''Circular shift of an empty vector
-                                makes no sense''')
-        if n < 0:
-            return self >> abs(n)
-        for i in range(n):
-            self.circular_rotate_left_by_one()
+        self._set_packed_int(self._rotated_int(n))
         return self
 
     def __rshift__(self, n):
@@ -2166,76 +2759,46 @@ class BitVector(object):
         the bitvector on which it is invoked.  This allows for a chained
         invocation of the operator.
         '''
-        if self.size == 0:
-            raise ValueError('''Circular shift of an empty vector
-                                makes no sense''')
-        if n < 0:
-            return self << abs(n)
-        for i in range(n):
-            self.circular_rotate_right_by_one()
+        self._set_packed_int(self._rotated_int(-n))
         return self
 
+    def rotated_left(self, n):
+        '''
+        Returns a new bitvector that is the bitvector on which the method is
+        invoked circularly rotated to the left by n positions.  Unlike the
+        '<<' operator, this method does not change the bitvector on which it
+        is invoked:
+
+            bv = BitVector(bitstring = '10010011')
+            print(bv.rotated_left(3))               # 10011100
+            print(bv)                               # 10010011
+        '''
+        res = BitVector(size=self.size)
+        res._set_packed_int(self._rotated_int(n))
+        return res
+
+    def rotated_right(self, n):
+        '''
+        Returns a new bitvector that is the bitvector on which the method is
+        invoked circularly rotated to the right by n positions.  Unlike the
+        '>>' operator, this method does not change the bitvector on which it
+        is invoked.
+        '''
+        res = BitVector(size=self.size)
+        res._set_packed_int(self._rotated_int(-n))
+        return res
+
     def circular_rotate_left_by_one(self):
         'For a one-bit in-place left circular shift'
-        size = len(self.vector)
-        bitstring_leftmost_bit = self.vector[0] & 1
-        left_most_bits = list(map(operator.__and__, self.vector, [1] * size))
-        left_most_bits.append(left_most_bits[0])
-        del(left_most_bits[0])
-        self.vector = list(map(operator.__rshift__, self.vector, [1] * size))
-        self.vector = list(map(operator.__or__, self.vector,
-                               list(map(operator.__lshift__, left_most_bits, [15] * size))))
-
-        self._setbit(self.size - 1, bitstring_leftmost_bit)
+        self._set_packed_int(self._rotated_int(1))
 
     def circular_rotate_right_by_one(self):
         'For a one-bit in-place right circular shift'
-        size = len(self.vector)
-        bitstring_rightmost_bit = self[self.size - 1]
-        right_most_bits = list(map(operator.__and__,
-                                   self.vector, [0x8000] * size))
-        self.vector = list(
-            map(operator.__and__, self.vector, [~0x8000] * size))
-        right_most_bits.insert(0, bitstring_rightmost_bit)
-        right_most_bits.pop()
-        self.vector = list(map(operator.__lshift__, self.vector, [1] * size))
-        self.vector = list(map(operator.__or__, self.vector,
-                               list(map(operator.__rshift__, right_most_bits, [15] * size))))
-
-        self._setbit(0, bitstring_rightmost_bit)
-
-    def circular_rot_left(self):
-        '''
-        This is merely another implementation of the method
-        circular_rotate_left_by_one() shown above.  This one does NOT use map
-        functions.  This method carries out a one-bit left circular shift of a bit
-        vector.
-        '''
-        max_index = (self.size - 1) // 16
-        left_most_bit = self.vector[0] & 1
-        self.vector[0] = self.vector[0] >> 1
-        for i in range(1, max_index + 1):
-            left_bit = self.vector[i] & 1
-            self.vector[i] = self.vector[i] >> 1
-            self.vector[i - 1] |= left_bit << 15
-        self._setbit(self.size - 1, left_most_bit)
-
-    def circular_rot_right(self):
-        '''
-        This is merely another implementation of the method
-        circular_rotate_right_by_one() shown above.  This one does NOT use map
-        functions.  This method does a one-bit right circular shift of a bit vector.
-        '''
-        max_index = (self.size - 1) // 16
-        right_most_bit = self[self.size - 1]
-        self.vector[max_index] &= ~0x8000
-        self.vector[max_index] = self.vector[max_index] << 1
-        for i in range(max_index - 1, -1, -1):
-            right_bit = self.vector[i] & 0x8000
-            self.vector[i] &= ~0x8000
-            self.vector[i] = self.vector[i] << 1
-            self.vector[i + 1] |= right_bit >> 15
-        self._setbit(0, right_most_bit)
+        self._set_packed_int(self._rotated_int(-1))
+
+    # For backward compatibility:
+    circular_rot_left = circular_rotate_left_by_one
+    circular_rot_right = circular_rotate_right_by_one
 
     def shift_left_by_one(self):
         '''
@@ -2244,14 +2807,7 @@ class BitVector(object):
         bitvector is discarded and rightmost bit of the returned vector is set to
         zero.
         '''
-        size = len(self.vector)
-        left_most_bits = list(map(operator.__and__, self.vector, [1] * size))
-        left_most_bits.append(left_most_bits[0])
-        del(left_most_bits[0])
-        self.vector = list(map(operator.__rshift__, self.vector, [1] * size))
-        self.vector = list(map(operator.__or__, self.vector,
-                               list(map(operator.__lshift__, left_most_bits, [15] * size))))
-        self._setbit(self.size - 1, 0)
+        self._set_packed_int(self._shifted_int(1))
 
     def shift_right_by_one(self):
         '''
@@ -2260,17 +2816,7 @@ class BitVector(object):
         bitvector is discarded and leftmost bit of the returned vector is set to
         zero.
         '''
-        size = len(self.vector)
-        right_most_bits = list(
-            map(operator.__and__, self.vector, [0x8000] * size))
-        self.vector = list(
-            map(operator.__and__, self.vector, [~0x8000] * size))
-        right_most_bits.insert(0, 0)
-        right_most_bits.pop()
-        self.vector = list(map(operator.__lshift__, self.vector, [1] * size))
-        self.vector = list(map(operator.__or__, self.vector,
-                               list(map(operator.__rshift__, right_most_bits, [15] * size))))
-        self._setbit(0, 0)
+        self._set_packed_int(self._shifted_int(-1))
 
     def shift_left(self, n):
         '''
@@ -2279,11 +2825,37 @@ class BitVector(object):
         left, the exposed bit positions at the right end are filled with
         zeros. This method returns the bitvector object on which it is
         invoked.  This is to allow for chained invocations of the method.
+        A negative n shifts the bitvector to the right.
         '''
-        for i in range(n):
-            self.shift_left_by_one()
+        self._set_packed_int(self._shifted_int(n))
         return self
 
+    def shifted_left(self, n):
+        '''
+        Returns a new bitvector that is the bitvector on which the method is
+        invoked shifted non-circularly to the left by n positions.  Unlike
+        shift_left(), this method does not change the bitvector on which it
+        is invoked:
+
+            bv = BitVector(bitstring = '10010011')
+            print(bv.shifted_left(3))               # 10011000
+            print(bv)                               # 10010011
+        '''
+        res = BitVector(size=self.size)
+        res._set_packed_int(self._shifted_int(n))
+        return res
+
+    def shifted_right(self, n):
+        '''
+        Returns a new bitvector that is the bitvector on which the method is
+        invoked shifted non-circularly to the right by n positions.  Unlike
+        shift_right(), this method does not change the bitvector on which it
+        is invoked.
+        '''
+        res = BitVector(size=self.size)
+        res._set_packed_int(self._shifted_int(-n))
+        return res
+
     def shift_right(self, n):
         '''
         Call this method if you want to shift in-place a bitvector to the right
@@ -2291,9 +2863,9 @@ class BitVector(object):
         right, the exposed bit positions at the left end are filled with
         zeros. This method returns the bitvector object on which it is
         invoked.  This is to allow for chained invocations of the method.
+        A negative n shifts the bitvector to the left.
         '''
-        for i in range(n):
-            self.shift_right_by_one()
+        self._set_packed_int(self._shifted_int(-n))
         return self
 
     # Allow array like subscripting for getting and setting:
@@ -2308,47 +2880,54 @@ class BitVector(object):
         '''
         # The following section is for slice assignment:
         if isinstance(pos, slice):
-            if (not isinstance(item, BitVector)):
+            if (not isinstance(item, (BitVector, BitVectorView))):
                 raise TypeError('''For slice assignment,
                     the right hand side must be a BitVector''')
-            if (not pos.start and not pos.stop):
-                return item.deep_copy()
-            elif not pos.start:
-                if (pos.stop != len(item)):
-                    raise ValueError(
-                        'incompatible lengths for slice assignment')
-                for i in range(pos.stop):
-                    self[i] = item[i]
-                return
-            elif not pos.stop:
-                if ((len(self) - pos.start) != len(item)):
-                    raise ValueError(
-                        'incompatible lengths for slice assignment')
-                for i in range(len(item) - 1):
-                    self[pos.start + i] = item[i]
-                return
-            else:
-                if ((pos.stop - pos.start) != len(item)):
-                    raise ValueError(
-                        'incompatible lengths for slice assignment')
-                for i in range(pos.start, pos.stop):
-                    self[i] = item[i - pos.start]
+            start, stop, step = pos.indices(self.size)
+            indices = range(start, stop, step)
+            if (len(indices) != len(item)):
+                raise ValueError(
+                    'incompatible lengths for slice assignment')
+            if step == 1:
+                self._set_packed_bits(start, len(item), item._get_packed_int())
                 return
+            # Extended slice assignment goes bit by bit, but without the
+            # range checks of _setbit():
+            v = self.vector
+            for i, bit in zip(indices, item._get_bits_in_index_order()):
+                if bit == '1':
+                    v[i // _WORD_BITS] |= 1 << (i % _WORD_BITS)
+                else:
+                    v[i // _WORD_BITS] &= ~(1 << (i % _WORD_BITS))
+            self._packed_int = None
+            self._hash = None
+            self._rank_index = None
+            return
         # For index assignment use _setbit()
         self._setbit(pos, item)
 
     def __getslice__(self, i, j):
         'Fetch slices with [i:j], [:], etc.'
-        if self.size == 0:
-            return BitVector(bitstring='')
-        if i == j:
-            return BitVector(bitstring='')
-        slicebits = []
-        if j > self.size:
-            j = self.size
-        for x in range(i, j):
-            slicebits.append(self[x])
-        return BitVector(bitlist=slicebits)
+        return self._getbit(slice(i, j))
+
+    def view(self, start=0, stop=None):
+        '''
+        Returns a BitVectorView for the bits at index positions start through
+        stop-1 without copying them:
+
+            bv = BitVector(hexstring = '4500003c1c4640004006')
+            version = bv.view(0, 4)
+            print(int(version))                     # 4
+
+        The view reads the bits from the words of the bitvector on which
+        the method is invoked, so it reflects any later changes to that
+        bitvector.  See the BitVectorView class for what you can do with a
+        view.
+        '''
+        if stop is None:
+            stop = self.size
+        start, stop, step = slice(start, stop).indices(self.size)
+        return BitVectorView(self, start, max(stop, start))
 
     # Allow len() to work:
     __len__ = _getsize
@@ -2366,33 +2945,67 @@ class BitVector(object):
         'To create a print representation'
         if self.size == 0:
             return ''
-        return ''.join(map(str, self))
+        # Since index 0 is the most significant bit of the integer value,
+        # the binary digits of that value are the bits in index order:
+        return format(self.int_val(), '0%db' % self.size)
 
     # Compare two bit vectors:
     def __eq__(self, other):
         if self.size != other.size:
             return False
-        i = 0
-        while (i < self.size):
-            if (self[i] != other[i]):
-                return False
-            i += 1
-        return True
+        if isinstance(other, BitVector):
+            # The unused bits of the last word are always zero, so equal
+            # bitvectors have equal word arrays:
+            return self.vector == other.vector
+        if isinstance(other, MappedBitVector):
+            # Leave it to the mapped file to compare a chunk at a time:
+            return other == self
+        return self._get_packed_int() == other._get_packed_int()
 
     def __ne__(self, other):
         return not self == other
 
+    def __hash__(self):
+        '''
+        Bitvectors that compare equal have the same hash value, so you can
+        use bitvectors as dictionary keys and as set members.  The hash
+        value is cached until the bits of the bitvector are changed.  As
+        with any mutable key, you must not change a bitvector while it is
+        in a set or serves as a dictionary key.
+        '''
+        if self._hash is None:
+            self._hash = hash((self.size, self._get_packed_int()))
+        return self._hash
+
+    def _compare(self, other):
+        '''
+        Returns a negative number, zero or a positive number according to
+        whether the integer value of this bit vector is less than, equal to
+        or greater than that of the other.  For bit vectors of the same size,
+        the words are compared starting from the one that holds index 0, so
+        the comparison stops at the first word in which they differ.
+        '''
+        if not isinstance(other, BitVector) or self.size != other.size:
+            self_int, other_int = self.intValue(), other.intValue()
+            return (self_int > other_int) - (self_int < other_int)
+        for self_word, other_word in zip(self.vector, other.vector):
+            if self_word != other_word:
+                # The lowest differing bit is the most significant one:
+                diff = self_word ^ other_word
+                return 1 if self_word & diff & -diff else -1
+        return 0
+
     def __lt__(self, other):
-        return self.intValue() < other.intValue()
+        return self._compare(other) < 0
 
     def __le__(self, other):
-        return self.intValue() <= other.intValue()
+        return self._compare(other) <= 0
 
     def __gt__(self, other):
-        return self.intValue() > other.intValue()
+        return self._compare(other) > 0
 
     def __ge__(self, other):
-        return self.intValue() >= other.intValue()
+        return self._compare(other) >= 0
 
     def deep_copy(self):
         '''
@@ -2403,8 +3016,12 @@ class BitVector(object):
         Subsequently, any alterations to either of the bitvector objects
         bitvec and bitvec_copy will not affect the other.
         '''
-        copy = str(self)
-        return BitVector(bitstring=copy)
+        copy = BitVector(size=self.size)
+        copy.vector = self.vector[:]
+        copy._packed_int = self._packed_int
+        copy._hash = self._hash
+        copy._rank_index = self._rank_index
+        return copy
 
     # For backward compatibility:
     _make_deep_copy = deep_copy
@@ -2414,16 +3031,18 @@ class BitVector(object):
         Resize a bit vector by padding with n 0's from the left. Return the result as
         a new bit vector.
         '''
-        new_str = '0' * n + str(self)
-        return BitVector(bitstring=new_str)
+        res = self.deep_copy()
+        res.pad_from_left(n)
+        return res
 
     def _resize_pad_from_right(self, n):
         '''
         Resize a bit vector by padding with n 0's from the right. Return the result
         as a new bit vector.
         '''
-        new_str = str(self) + '0' * n
-        return BitVector(bitstring=new_str)
+        res = self.deep_copy()
+        res.pad_from_right(n)
+        return res
 
     def pad_from_left(self, n):
         '''
@@ -2434,12 +3053,12 @@ class BitVector(object):
         the extension is carried out by giving a new longer _vector
         attribute to the bitvector object).
         '''
-        new_str = '0' * n + str(self)
-        bitlist = list(map(int, list(new_str)))
-        self.size = len(bitlist)
-        two_byte_ints_needed = (len(bitlist) + 15) // 16
-        self.vector = array.array('H', [0] * two_byte_ints_needed)
-        list(map(self._setbit, enumerate(bitlist), bitlist))
+        if n <= 0:
+            return self
+        value = self._get_packed_int()
+        self.size += n
+        self._set_packed_int(value << n)
+        return self
 
     def pad_from_right(self, n):
         '''
@@ -2450,12 +3069,15 @@ class BitVector(object):
         the extension is carried out by giving a new longer _vector
         attribute to the bitvector object).
         '''
-        new_str = str(self) + '0' * n
-        bitlist = list(map(int, list(new_str)))
-        self.size = len(bitlist)
-        two_byte_ints_needed = (len(bitlist) + 15) // 16
-        self.vector = array.array('H', [0] * two_byte_ints_needed)
-        list(map(self._setbit, enumerate(bitlist), bitlist))
+        if n <= 0:
+            return self
+        # None of the existing bits move, so it suffices to append zero words:
+        self.size += n
+        self._hash = None
+        self._rank_index = None
+        words_needed = (self.size + _WORD_BITS - 1) // _WORD_BITS
+        self.vector.extend(_zero_words((words_needed - len(self.vector)) * _WORD_BITS))
+        return self
 
     def __contains__(self, otherBitVec):
         '''
@@ -2465,11 +3087,84 @@ class BitVector(object):
             raise ValueError("First arg bitvec has no bits")
         elif self.size < otherBitVec.size:
             raise ValueError("First arg bitvec too short")
-        max_index = self.size - otherBitVec.size + 1
-        for i in range(max_index):
-            if self[i:i + otherBitVec.size] == otherBitVec:
-                return True
-        return False
+        return self.find(otherBitVec) != -1
+
+    def _match_mask(self, pattern, start, end):
+        '''
+        Searches for all the occurrences of the pattern bitvector at once
+        with the bit-parallel shift-and method.  The start and end arguments
+        are interpreted as in slice notation.  Returns the integer whose bit
+        k is set if the pattern occurs at index position start + k, together
+        with the start position.  The mask starts out with a bit set for
+        every position at which the pattern would fit, and for each bit of
+        the pattern it is ANDed with the bits of the bitvector, or with
+        their complement, shifted by the position of that bit in the
+        pattern.  Each step works on whole integers, so the search takes
+        one pass over the packed bits per bit of the pattern, and it stops
+        early as soon as no candidate position remains.
+        '''
+        start, end, step = slice(start, end).indices(self.size)
+        length = end - start
+        if pattern.size > length:
+            return 0, start
+        all_ones = (1 << length) - 1
+        window = (self._get_packed_int() >> start) & all_ones
+        complement = window ^ all_ones
+        mask = (1 << (length - pattern.size + 1)) - 1
+        for j, bit in enumerate(pattern._get_bits_in_index_order()):
+            mask &= (window if bit == '1' else complement) >> j
+            if not mask:
+                break
+        return mask, start
+
+    def find(self, pattern, start=0, end=None):
+        '''
+        Returns the lowest index position at which the bits of the pattern
+        bitvector occur within index positions start through end-1, or -1 if
+        they do not occur there.  As with str.find(), start and end are
+        interpreted as in slice notation:
+
+            bv = BitVector(bitstring = '0001101011010110')
+            print(bv.find(BitVector(bitstring = '1011')))       # 6
+            print(bv.find(BitVector(bitstring = '1011'), 5))    # 6
+        '''
+        mask, start = self._match_mask(pattern, start, end)
+        if not mask:
+            return -1
+        return start + (mask & -mask).bit_length() - 1
+
+    def rfind(self, pattern, start=0, end=None):
+        '''
+        Like find(), but returns the highest index position at which the
+        pattern occurs.
+        '''
+        mask, start = self._match_mask(pattern, start, end)
+        if not mask:
+            return -1
+        return start + mask.bit_length() - 1
+
+    def find_all(self, pattern, start=0, end=None):
+        '''
+        Returns the list of all the index positions at which the pattern
+        occurs, in increasing order.  Overlapping occurrences are included:
+
+            bv = BitVector(bitstring = '1010101')
+            print(bv.find_all(BitVector(bitstring = '101')))    # [0, 2, 4]
+        '''
+        mask, start = self._match_mask(pattern, start, end)
+        # Going through the words of a bitvector avoids rewriting the whole
+        # mask for every occurrence:
+        matches = BitVector(size=mask.bit_length())
+        matches._set_packed_int(mask)
+        return [start + i for i in matches.iter_set_bits()]
+
+    def count_occurrences(self, pattern, start=0, end=None):
+        '''
+        Returns the number of index positions at which the pattern occurs,
+        counting overlapping occurrences, so that this is the length of the
+        list returned by find_all().
+        '''
+        return _popcount(self._match_mask(pattern, start, end)[0])
 
     def reset(self, val):
         '''
@@ -2495,8 +3190,7 @@ class BitVector(object):
         A call to count_bits() returns an integer value that is equal to
         the number of bits set in the bitvector.
         '''
-        from functools import reduce
-        return reduce(lambda x, y: int(x) + int(y), self)
+        return _popcount(self._get_packed_int())
 
     def set_value(self, *args, **kwargs):
         '''
@@ -2540,21 +3234,13 @@ class BitVector(object):
         this method, estimates that if a bit vector with over 2 millions
         bits has only five bits set, this will return the answer in 1/18 of
         the time taken by the count_bits() method. Rhianon's implementation
-        is based on an algorithm generally known as the Brian Kernighan's
+        was based on an algorithm generally known as the Brian Kernighan's
         way, although its antecedents predate its mention by Kernighan and
-        Ritchie.
+        Ritchie.  Both methods now count the bits of all the words in a
+        single step, so they are equally fast for sparse and dense
+        bitvectors.
         '''
-        num = 0
-        for intval in self.vector:
-            if intval == 0:
-                continue
-            c = 0
-            iv = intval
-            while iv > 0:
-                iv = iv & (iv - 1)
-                c = c + 1
-            num = num + c
-        return num
+        return _popcount(self._get_packed_int())
 
     def jaccard_similarity(self, other):
         '''
@@ -2567,12 +3253,11 @@ class BitVector(object):
 
         The value returned is a floating point number between 0 and 1.
         '''
-        assert self.intValue() > 0 or other.intValue(
-        ) > 0, 'Jaccard called on two zero vectors --- NOT ALLOWED'
+        self_int = self._get_packed_int()
+        other_int = other._get_packed_int()
+        assert self_int or other_int, 'Jaccard called on two zero vectors --- NOT ALLOWED'
         assert self.size == other.size, 'bitvectors for comparing with Jaccard must be of equal length'
-        intersect = self & other
-        union = self | other
-        return (intersect.count_bits_sparse() / float(union.count_bits_sparse()))
+        return _popcount(self_int & other_int) / float(_popcount(self_int | other_int))
 
     def jaccard_distance(self, other):
         '''
@@ -2600,8 +3285,46 @@ class BitVector(object):
         positions in which the two operand bitvectors disagree.
         '''
         assert self.size == other.size, 'vectors of unequal length'
-        diff = self ^ other
-        return diff.count_bits_sparse()
+        return _popcount(self._get_packed_int() ^ other._get_packed_int())
+
+    def iter_set_bits(self):
+        '''
+        You can iterate over the positions of the set bits of a bitvector
+        with
+
+            bv = BitVector(bitstring = '0010010000001')
+            print(list(bv.iter_set_bits()))        # [2, 5, 12]
+
+        The positions are produced lazily in increasing order.  Since words
+        with no bits set are skipped at once, this takes time proportional
+        to the number of words plus the number of set bits, rather than to
+        the number of bits.
+        '''
+        for word_index, word in enumerate(self.vector):
+            base = word_index * _WORD_BITS
+            while word:
+                lowest = word & -word
+                yield base + lowest.bit_length() - 1
+                word ^= lowest
+
+    def iter_clear_bits(self):
+        '''
+        The counterpart of iter_set_bits(): yields the positions of the
+        bits that are not set, in increasing order:
+
+            bv = BitVector(bitstring = '1101111')
+            print(list(bv.iter_clear_bits()))      # [2]
+        '''
+        last_index = len(self.vector) - 1
+        for word_index, word in enumerate(self.vector):
+            base = word_index * _WORD_BITS
+            word ^= _WORD_MASK
+            if word_index == last_index:
+                word &= (1 << (self.size - base)) - 1
+            while word:
+                lowest = word & -word
+                yield base + lowest.bit_length() - 1
+                word ^= lowest
 
     def next_set_bit(self, from_index=0):
         '''
@@ -2619,27 +3342,86 @@ class BitVector(object):
         John Gleeson.
         '''
         assert from_index >= 0, 'from_index must be nonnegative'
-        i = from_index
+        return self._scan_forward(from_index, 0)
+
+    def _scan_forward(self, from_index, flip):
+        '''
+        Returns the index of the first bit at or after from_index that is set
+        if flip is 0, or that is not set if flip is _WORD_MASK, or -1 if there
+        is no such bit.  Words without such a bit are skipped whole, and the
+        bit within a word is found in one step as the lowest set bit of the
+        (flipped) word.
+        '''
+        if from_index >= self.size:
+            return -1
         v = self.vector
-        l = len(v)
-        o = i >> 4
-        s = i & 0x0F
-        i = o << 4
-        while o < l:
-            h = v[o]
-            if h:
-                i += s
-                m = 1 << s
-                while m != (1 << 0x10):
-                    if h & m:
-                        return i
-                    m <<= 1
-                    i += 1
-            else:
-                i += 0x10
-            s = 0
+        last = len(v) - 1
+        o = from_index // _WORD_BITS
+        word = (v[o] ^ flip) & (_WORD_MASK << (from_index % _WORD_BITS))
+        while True:
+            if o == last:
+                # Flipping sets the unused bits of the last word
+                word &= (1 << (self.size - o * _WORD_BITS)) - 1
+            if word:
+                return o * _WORD_BITS + (word & -word).bit_length() - 1
             o += 1
-        return -1
+            if o > last:
+                return -1
+            word = v[o] ^ flip
+
+    def _scan_backward(self, from_index, flip):
+        '''
+        The mirror image of _scan_forward(): returns the index of the last
+        bit at or before from_index that is set if flip is 0, or that is not
+        set if flip is _WORD_MASK, or -1 if there is no such bit.
+        '''
+        if from_index < 0 or self.size == 0:
+            return -1
+        from_index = min(from_index, self.size - 1)
+        v = self.vector
+        last = len(v) - 1
+        o = from_index // _WORD_BITS
+        word = (v[o] ^ flip) & ((2 << (from_index % _WORD_BITS)) - 1)
+        while True:
+            if o == last:
+                word &= (1 << (self.size - o * _WORD_BITS)) - 1
+            if word:
+                return o * _WORD_BITS + word.bit_length() - 1
+            o -= 1
+            if o < 0:
+                return -1
+            word = v[o] ^ flip
+
+    def prev_set_bit(self, from_index):
+        '''
+        Returns the index of the last set bit at or before from_index, or -1
+        if there is none.  A from_index beyond the end of the bitvector is
+        taken to be its last index.
+        '''
+        return self._scan_backward(from_index, 0)
+
+    def next_clear_bit(self, from_index=0):
+        '''
+        Returns the index of the first bit at or after from_index that is not
+        set, or -1 if there is none.
+        '''
+        assert from_index >= 0, 'from_index must be nonnegative'
+        return self._scan_forward(from_index, _WORD_MASK)
+
+    def prev_clear_bit(self, from_index):
+        '''
+        Returns the index of the last bit at or before from_index that is not
+        set, or -1 if there is none.
+        '''
+        return self._scan_backward(from_index, _WORD_MASK)
+
+    def first_set_bit(self):
+        'Returns the index of the first set bit, or -1 if no bit is set'
+        return self._scan_forward(0, 0)
+
+    def last_set_bit(self):
+        'Returns the index of the last set bit, or -1 if no bit is set'
+        return self._scan_backward(self.size - 1, 0)
 
     def rank_of_bit_set_at_index(self, position):
         '''
@@ -2657,8 +3439,142 @@ class BitVector(object):
         number.
         '''
         assert self[position] == 1, 'the arg bit not set'
-        bv = self[0:position + 1]
-        return bv.count_bits()
+        return self.rank1(position)
+
+    def _get_rank_index(self):
+        '''
+        Returns the rank/select directory of the bit vector, building it if
+        necessary.  The directory consists of two arrays.  The first holds,
+        for every superblock of _RANK_SUPERBLOCK_WORDS words, the number of
+        bits set in all the superblocks before it.  The second holds, for
+        every block of _RANK_BLOCK_WORDS words, the number of bits set in
+        the blocks before it in its own superblock.  These counts are small
+        enough for 16-bit entries.  With 64-bit words, that is one 64-bit
+        entry per 4096 bits and one 16-bit entry per 512 bits, so the
+        directory takes up under 5 percent of the memory of the bits.  The
+        bits within a block are counted when a query needs them.  The total
+        number of bits set comes along with the arrays.
+        Like the packed integer, the directory is kept until the bits are
+        changed.
+        '''
+        if self._rank_index is None:
+            superblock_ranks = array.array(_WORD_TYPECODE)
+            block_ranks = array.array('H')
+            total = 0
+            for word_index, word in enumerate(self.vector):
+                if word_index % _RANK_SUPERBLOCK_WORDS == 0:
+                    superblock_ranks.append(total)
+                    in_superblock = 0
+                if word_index % _RANK_BLOCK_WORDS == 0:
+                    block_ranks.append(in_superblock)
+                count = _popcount(word)
+                in_superblock += count
+                total += count
+            self._rank_index = (superblock_ranks, block_ranks, total)
+        return self._rank_index
+
+    def rank1(self, position):
+        '''
+        Returns the number of bits set at the index positions 0 through
+        position, both included.  Unlike rank_of_bit_set_at_index(), the
+        bit at the position itself need not be set.
+        '''
+        if position >= self.size or position < -self.size:
+            raise ValueError("index range error")
+        if position < 0:
+            position = self.size + position
+        superblock_ranks, block_ranks = self._get_rank_index()[:2]
+        word_index = position // _WORD_BITS
+        mask = (2 << (position % _WORD_BITS)) - 1
+        # Count the bits of the words before this one in its block:
+        in_block = word_index - word_index % _RANK_BLOCK_WORDS
+        return (superblock_ranks[word_index // _RANK_SUPERBLOCK_WORDS] +
+                block_ranks[word_index // _RANK_BLOCK_WORDS] +
+                sum(map(_popcount, self.vector[in_block:word_index])) +
+                _popcount(self.vector[word_index] & mask))
+
+    def rank0(self, position):
+        '''
+        Returns the number of bits not set at the index positions 0 through
+        position, both included.
+        '''
+        if position >= self.size or position < -self.size:
+            raise ValueError("index range error")
+        if position < 0:
+            position = self.size + position
+        return position + 1 - self.rank1(position)
+
+    def _select(self, k, ones):
+        '''
+        Returns the position of the k-th set bit if ones is True, or of the
+        k-th bit that is not set otherwise, counting from k = 1.  The
+        superblock is found by binary search in the rank/select directory,
+        the block by a scan of the block counts of the superblock, the word
+        by a scan of at most _RANK_BLOCK_WORDS words, and the bit by
+        removing the lower set bits of the word.
+        '''
+        superblock_ranks, block_ranks, count_set = self._get_rank_index()
+        superblock_bits = _RANK_SUPERBLOCK_WORDS * _WORD_BITS
+        block_bits = _RANK_BLOCK_WORDS * _WORD_BITS
+        blocks_per_superblock = _RANK_SUPERBLOCK_WORDS // _RANK_BLOCK_WORDS
+
+        def before(superblock):
+            'The number of bits of interest in the superblocks before this one'
+            if ones:
+                return superblock_ranks[superblock]
+            return superblock * superblock_bits - superblock_ranks[superblock]
+
+        def before_block(block):
+            'The number of bits of interest before this block in its superblock'
+            if ones:
+                return block_ranks[block]
+            return (block % blocks_per_superblock) * block_bits - block_ranks[block]
+        total = count_set if ones else self.size - count_set
+        if k < 1 or k > total:
+            raise ValueError("there are fewer than k bits with the value sought")
+        low, high = 0, len(superblock_ranks) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if before(middle) < k:
+                low = middle
+            else:
+                high = middle - 1
+        k -= before(low)
+        block = low * blocks_per_superblock
+        last_block = min(block + blocks_per_superblock, len(block_ranks)) - 1
+        while block < last_block and before_block(block + 1) < k:
+            block += 1
+        k -= before_block(block)
+        word_index = block * _RANK_BLOCK_WORDS
+        while True:
+            word = self.vector[word_index]
+            if not ones:
+                word ^= _WORD_MASK
+                if word_index == len(self.vector) - 1:
+                    word &= (1 << (self.size - word_index * _WORD_BITS)) - 1
+            count = _popcount(word)
+            if k <= count:
+                break
+            k -= count
+            word_index += 1
+        for _ in range(k - 1):
+            word &= word - 1
+        return word_index * _WORD_BITS + (word & -word).bit_length() - 1
+
+    def select1(self, k):
+        '''
+        Returns the index position of the k-th set bit, counting from
+        k = 1.  For a set bit at position i, select1(rank1(i)) is i.
+        Raises ValueError if fewer than k bits are set.
+        '''
+        return self._select(k, True)
+
+    def select0(self, k):
+        '''
+        Returns the index position of the k-th bit that is not set, counting
+        from k = 1.  Raises ValueError if fewer than k bits are not set.
+        '''
+        return self._select(k, False)
 
     def is_power_of_2(self):
         '''
@@ -2694,7 +3610,7 @@ class BitVector(object):
 
         This predicate returns 1 for true and 0 for false.
         '''
-        if self.count_bits_sparse() == 1:
+        if _popcount(self._get_packed_int()) == 1:
             return True
         return False
 
@@ -2797,17 +3713,12 @@ class BitVector(object):
         '''
         a = self.deep_copy()
         b_copy = b.deep_copy()
-        a_highest_power = a.length() - a.next_set_bit(0) - 1
-        b_highest_power = b.length() - b_copy.next_set_bit(0) - 1
         result = BitVector(size=a.length() + b_copy.length())
         a.pad_from_left(result.length() - a.length())
         b_copy.pad_from_left(result.length() - b_copy.length())
-        for i, bit in enumerate(b_copy):
-            if bit == 1:
-                power = b_copy.length() - i - 1
-                a_copy = a.deep_copy()
-                a_copy.shift_left(power)
-                result ^= a_copy
+        for i in b_copy.iter_set_bits():
+            power = b_copy.length() - i - 1
+            result ^= a.shifted_left(power)
         return result
 
     def gf_divide_by_modulus(self, mod, n):
@@ -2835,17 +3746,18 @@ class BitVector(object):
             raise ValueError("Modulus bit pattern too long")
         quotient = BitVector(intVal=0, size=num.length())
         remainder = num.deep_copy()
+        mod_highest_power = mod.length() - mod.first_set_bit() - 1
         i = 0
         while 1:
             i = i + 1
             if (i == num.length()):
                 break
-            mod_highest_power = mod.length() - mod.next_set_bit(0) - 1
-            if remainder.next_set_bit(0) == -1:
+            remainder_first_set_bit = remainder.first_set_bit()
+            if remainder_first_set_bit == -1:
                 remainder_highest_power = 0
             else:
                 remainder_highest_power = remainder.length(
-                ) - remainder.next_set_bit(0) - 1
+                ) - remainder_first_set_bit - 1
             if (remainder_highest_power < mod_highest_power) or int(remainder) == 0:
                 break
             else:
@@ -2933,27 +3845,36 @@ class BitVector(object):
         '''
         if self.size == 0:
             raise ValueError('''An empty vector has no runs''')
-        allruns = []
-        run = ''
-        previous_bit = self[0]
-        if previous_bit == 0:
-            run = '0'
-        else:
-            run = '1'
-        for bit in list(self)[1:]:
-            if bit == 0 and previous_bit == 0:
-                run += '0'
-            elif bit == 1 and previous_bit == 0:
-                allruns.append(run)
-                run = '1'
-            elif bit == 0 and previous_bit == 1:
-                allruns.append(run)
-                run = '0'
-            else:
-                run += '1'
-            previous_bit = bit
-        allruns.append(run)
-        return allruns
+        return [str(value) * length for value, start, length in self.run_lengths()]
+
+    def run_lengths(self):
+        '''
+        Returns the runs of 1's and 0's in the vector as a list of (value,
+        start, length) tuples, where value is the bit value of the run, start
+        the index position of its first bit and length the number of bits in
+        it:
+
+           bv = BitVector(bitlist = (1,1, 1, 0, 0, 1))
+           print(bv.run_lengths())              # [(1, 0, 3), (0, 3, 2), (1, 5, 1)]
+
+        The runs are found without looking at the bits one at a time: XORing
+        the bits with the bits one position further on sets a bit at the end
+        of every run but the last, and iter_set_bits() finds those.
+        '''
+        if self.size == 0:
+            return []
+        packed = self._get_packed_int()
+        boundaries = BitVector(size=self.size - 1)
+        boundaries._set_packed_int((packed ^ (packed >> 1)) & ((1 << (self.size - 1)) - 1))
+        runs = []
+        value = packed & 1
+        start = 0
+        for last in boundaries.iter_set_bits():
+            runs.append((value, start, last + 1 - start))
+            value ^= 1
+            start = last + 1
+        runs.append((value, start, self.size - start))
+        return runs
 
     def test_for_primality(self):
         '''
@@ -3030,25 +3951,732 @@ class BitVector(object):
     gen_rand_bits_for_prime = gen_random_bits
 
 
+#-----------------------  BitVectorView Class -----------------------
+
+class BitVectorView(object):
+    '''
+    A view of a contiguous range of the bits of a parent bitvector.  Views
+    are returned by BitVector.view().  Creating a view copies no bits: the
+    view keeps a reference to the parent together with the offset and the
+    length of the range, and reads only the parent words that hold that
+    range.  A view supports indexing, slicing, len(), int(), str(),
+    iteration, the comparison operators, the logical operators and
+    count_bits().  The logical operators return new bitvectors.
+
+    The first index or slice assignment to a view gives the view its own
+    copy of its bits, so writing to a view never changes the parent.  Until
+    then, the view reflects any changes made to the parent.
+    '''
+
+    def __init__(self, parent, start, stop):
+        self._parent = parent
+        self._offset = start
+        self._copied = False
+        self.size = stop - start
+
+    def _get_packed_int(self):
+        return self._parent._get_packed_bits(self._offset, self.size)
+
+    def _get_packed_bits(self, start, length):
+        return self._parent._get_packed_bits(self._offset + start, length)
+
+    def _get_bits_in_index_order(self, start=0, length=None):
+        if length is None:
+            length = self.size - start
+        return self._parent._get_bits_in_index_order(self._offset + start, length)
+
+    def _getbit(self, pos):
+        'Get the bit or the slice at the designated position'
+        if isinstance(pos, slice):
+            start, stop, step = pos.indices(self.size)
+            if step == 1:
+                return self._parent[self._offset + start:
+                                    self._offset + max(stop, start)]
+            return self._parent._get_stepped_bits(
+                self._offset + start, self._offset + stop, step)
+        if pos >= self.size or pos < -self.size:
+            raise ValueError("index range error")
+        if pos < 0:
+            pos = self.size + pos
+        return self._parent._getbit(self._offset + pos)
+
+    __getitem__ = _getbit
+
+    def __setitem__(self, pos, item):
+        'Copy the bits of the view on the first write, then write to the copy'
+        if not self._copied:
+            self._parent = self.deep_copy()
+            self._offset = 0
+            self._copied = True
+        self._parent[pos] = item
+
+    def view(self, start=0, stop=None):
+        'Returns a view of a range of the bits of this view'
+        if stop is None:
+            stop = self.size
+        start, stop, step = slice(start, stop).indices(self.size)
+        return BitVectorView(self._parent, self._offset + start,
+                             self._offset + max(stop, start))
+
+    def deep_copy(self):
+        'Returns a new BitVector with the bits of the view'
+        res = BitVector(size=self.size)
+        res._set_packed_int(self._get_packed_int())
+        return res
+
+    def __len__(self):
+        return self.size
+
+    def length(self):
+        return self.size
+
+    def __iter__(self):
+        # As in BitVectorIterator, look up the bits of each byte in _BYTE_BITS:
+        data = _int_to_bytes(self._get_packed_int(), (self.size + 7) // 8, 'little')
+        bits = itertools.chain.from_iterable(
+            map(_BYTE_BITS.__getitem__, bytearray(data)))
+        return itertools.islice(bits, self.size)
+
+    def __str__(self):
+        if self.size == 0:
+            return ''
+        return format(self.int_val(), '0%db' % self.size)
+
+    def int_val(self):
+        'Return the integer value of the bits of the view'
+        if self.size == 0:
+            return 0
+        # Read the parent words that hold the view the way BitVector.int_val()
+        # reads all of its words, then cut the view's bits out of the result:
+        first = self._offset // _WORD_BITS
+        last = (self._offset + self.size - 1) // _WORD_BITS
+        data = _words_to_bytes(self._parent.vector[first:last + 1]).translate(_REVERSED_BYTES)
+        shift = len(data) * 8 - self._offset % _WORD_BITS - self.size
+        return (_int_from_bytes(data, 'big') >> shift) & ((1 << self.size) - 1)
+
+    intValue = int_val
+    __int__ = int_val
+
+    def count_bits(self):
+        'Return the number of bits set in the view'
+        return _popcount(self._get_packed_int())
+
+    def __eq__(self, other):
+        if self.size != other.size:
+            return False
+        if isinstance(other, MappedBitVector):
+            return other == self
+        return self._get_packed_int() == other._get_packed_int()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        'Hashes equal to a BitVector with the same bits'
+        return hash((self.size, self._get_packed_int()))
+
+    def __lt__(self, other):
+        return self.intValue() < other.intValue()
+
+    def __le__(self, other):
+        return self.intValue() <= other.intValue()
+
+    def __gt__(self, other):
+        return self.intValue() > other.intValue()
+
+    def __ge__(self, other):
+        return self.intValue() >= other.intValue()
+
+    def __xor__(self, other):
+        return self.deep_copy() ^ other
+
+    def __and__(self, other):
+        return self.deep_copy() & other
+
+    def __or__(self, other):
+        return self.deep_copy() | other
+
+    def __invert__(self):
+        return ~self.deep_copy()
+
+
+#---------------------  MappedBitVector Class ----------------------
+
+class MappedBitVector(object):
+    '''
+    A bitvector whose bits are those of a disk file mapped into memory with
+    mmap.  Index 0 is the most significant bit of the first byte of the
+    file, which is the bit order in which read_bits_from_file() reads a
+    file.  Nothing is read when a MappedBitVector is created; the operating
+    system brings in the pages of the file as they are accessed.  Indexing,
+    slicing, count_bits(), next_set_bit() and iteration work directly on the
+    mapped bytes, processing large ranges a megabyte at a time.  Slices and
+    the results of the logical operators are ordinary bitvectors.
+
+    With writable=True, assignments to bits and slices and the in-place
+    logical operators change the file itself.  The size of a mapped
+    bitvector is fixed by the file, so the operand of an in-place logical
+    operator must be of the same size.
+    '''
+
+    def __init__(self, filename, writable=False, size=None):
+        self.filename = filename
+        self.writable = writable
+        self._file = open(filename, 'r+b' if writable else 'rb')
+        self._file.seek(0, 2)
+        file_size = self._file.tell()
+        if size is None:
+            size = 8 * file_size
+        elif size < 0 or size > 8 * file_size:
+            self._file.close()
+            raise ValueError("size must be between 0 and the number of bits in the file")
+        self.size = size
+        if file_size == 0:
+            # mmap cannot map an empty file
+            self._map = bytearray()
+        else:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+    def _get_int(self, start, stop):
+        'The integer value of the bits at index positions start through stop-1'
+        if stop <= start:
+            return 0
+        first, last = start // 8, (stop + 7) // 8
+        value = _int_from_bytes(self._map[first:last], 'big')
+        return (value >> (8 * last - stop)) & ((1 << (stop - start)) - 1)
+
+    def _set_int(self, start, stop, value):
+        'Set the bits at index positions start through stop-1 from an integer'
+        if stop <= start:
+            return
+        first, last = start // 8, (stop + 7) // 8
+        shift = 8 * last - stop
+        mask = ((1 << (stop - start)) - 1) << shift
+        old = _int_from_bytes(self._map[first:last], 'big')
+        new = (old & ~mask) | (value << shift)
+        self._map[first:last] = _int_to_bytes(new, last - first, 'big')
+
+    def _check_writable(self):
+        if not self.writable:
+            raise TypeError("MappedBitVector was not opened with writable=True")
+
+    def _getbit(self, pos):
+        'Get the bit or the slice at the designated position'
+        if isinstance(pos, slice):
+            start, stop, step = pos.indices(self.size)
+            if step != 1:
+                # Read only the bits between the first and last index:
+                bounds = _stepped_bounds(start, stop, step)
+                if bounds is None:
+                    return BitVector(size=0)
+                lo, hi = bounds
+                return self[lo:hi]._get_stepped_bits(start - lo, stop - lo, step)
+            stop = max(stop, start)
+            if stop == start:
+                return BitVector(size=0)
+            return BitVector(intVal=self._get_int(start, stop), size=stop - start)
+        if pos >= self.size or pos < -self.size:
+            raise ValueError("index range error")
+        if pos < 0:
+            pos = self.size + pos
+        return (bytearray(self._map[pos // 8:pos // 8 + 1])[0] >> (7 - pos % 8)) & 1
+
+    __getitem__ = _getbit
+
+    def __setitem__(self, pos, item):
+        'Set the bit or the slice at the designated position in the file'
+        self._check_writable()
+        if isinstance(pos, slice):
+            if (not isinstance(item, (BitVector, BitVectorView))):
+                raise TypeError('''For slice assignment,
+                    the right hand side must be a BitVector''')
+            indices = range(*pos.indices(self.size))
+            if len(indices) != item.size:
+                raise ValueError('incompatible lengths for slice assignment')
+            if len(indices) and indices[-1] - indices[0] == len(indices) - 1:
+                self._set_int(indices[0], indices[-1] + 1, item.int_val())
+            else:
+                for i, bit in zip(indices, item):
+                    self._set_int(i, i + 1, bit)
+            return
+        if item not in (0, 1):
+            raise ValueError("incorrect value for a bit")
+        if pos >= self.size or pos < -self.size:
+            raise ValueError("index range error")
+        if pos < 0:
+            pos = self.size + pos
+        self._set_int(pos, pos + 1, item)
+
+    def __len__(self):
+        return self.size
+
+    def length(self):
+        return self.size
+
+    def _chunks(self):
+        '''
+        Yields (start, stop) pairs of bit positions that cover all the bits
+        a megabyte at a time.  Every chunk but the last starts and ends on a
+        byte boundary.
+        '''
+        chunk_bits = 8 * _MAPPED_CHUNK_BYTES
+        for start in range(0, self.size, chunk_bits):
+            yield start, min(start + chunk_bits, self.size)
+
+    def __iter__(self):
+        for start, stop in self._chunks():
+            for bit in BitVector(intVal=self._get_int(start, stop), size=stop - start):
+                yield bit
+
+    def deep_copy(self):
+        'Returns a new BitVector with all the bits of the mapped file'
+        res = BitVector(size=0)
+        nbytes = (self.size + 7) // 8
+        data = bytes(self._map[:nbytes])
+        if self.size % 8:
+            # Clear the bits of the last byte that lie beyond the size
+            last = bytearray(data[-1:])[0] & (0xff << (8 - self.size % 8)) & 0xff
+            data = data[:-1] + bytes(bytearray([last]))
+        res._load_bytes(data, self.size)
+        return res
+
+    def _get_packed_int(self):
+        # Reversing the bits of each byte puts index 0 at the least
+        # significant bit of a little-endian integer:
+        nbytes = (self.size + 7) // 8
+        value = _int_from_bytes(self._map[:nbytes].translate(_REVERSED_BYTES), 'little')
+        return value & ((1 << self.size) - 1)
+
+    def __str__(self):
+        return str(self.deep_copy())
+
+    def int_val(self):
+        'Return the integer value of the bits of the mapped file'
+        return self._get_int(0, self.size)
+
+    intValue = int_val
+    __int__ = int_val
+
+    def count_bits(self):
+        'Return the number of bits set in the mapped file'
+        return sum(_popcount(self._get_int(start, stop))
+                   for start, stop in self._chunks())
+
+    def next_set_bit(self, from_index=0):
+        '''
+        Return the index of the first set bit at or after from_index, or -1
+        if there is none.  Whole zero bytes are skipped by bytes.lstrip().
+        '''
+        assert from_index >= 0, 'from_index must be nonnegative'
+        if from_index >= self.size:
+            return -1
+        first = from_index // 8
+        byte = bytearray(self._map[first:first + 1])[0] & (0xff >> (from_index % 8))
+        pos = -1
+        if byte:
+            pos = 8 * first + 8 - byte.bit_length()
+        else:
+            start = first + 1
+            nbytes = (self.size + 7) // 8
+            while start < nbytes:
+                chunk = bytes(self._map[start:min(start + _MAPPED_CHUNK_BYTES, nbytes)])
+                rest = chunk.lstrip(b'\0')
+                if rest:
+                    byte = bytearray(rest[:1])[0]
+                    pos = 8 * (start + len(chunk) - len(rest)) + 8 - byte.bit_length()
+                    break
+                start += len(chunk)
+        return pos if pos < self.size else -1
+
+    def __eq__(self, other):
+        '''
+        Compares the bits of the mapped file with those of other a megabyte
+        at a time, stopping at the first chunk that differs.
+        '''
+        if self.size != other.size:
+            return False
+        if isinstance(other, CompressedBitVector):
+            return other == self
+        for start, stop in self._chunks():
+            if isinstance(other, MappedBitVector):
+                other_int = other._get_int(start, stop)
+            else:
+                other_int = other[start:stop].int_val()
+            if self._get_int(start, stop) != other_int:
+                return False
+        return True
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __xor__(self, other):
+        return self.deep_copy() ^ other
+
+    def __and__(self, other):
+        return self.deep_copy() & other
+
+    def __or__(self, other):
+        return self.deep_copy() | other
+
+    def __invert__(self):
+        return ~self.deep_copy()
+
+    def _combine_into(self, other, op):
+        '''
+        For the in-place logical operators.  Combines the bits of other with
+        those of the mapped file a megabyte at a time and writes the results
+        back to the file.
+        '''
+        self._check_writable()
+        if self.size != other.size:
+            raise ValueError("the operand must be of the same size as the mapped file")
+        for start, stop in self._chunks():
+            if isinstance(other, MappedBitVector):
+                other_int = other._get_int(start, stop)
+            else:
+                other_int = other[start:stop].int_val()
+            self._set_int(start, stop, op(self._get_int(start, stop), other_int))
+        return self
+
+    def xor_into(self, other):
+        'In-place XOR that writes the result to the mapped file'
+        return self._combine_into(other, lambda x, y: x ^ y)
+
+    def and_into(self, other):
+        'In-place AND that writes the result to the mapped file'
+        return self._combine_into(other, lambda x, y: x & y)
+
+    def or_into(self, other):
+        'In-place OR that writes the result to the mapped file'
+        return self._combine_into(other, lambda x, y: x | y)
+
+    __ixor__ = xor_into
+    __iand__ = and_into
+    __ior__ = or_into
+
+    def flush(self):
+        'Write any changes to the mapped bytes out to the file'
+        if isinstance(self._map, mmap.mmap):
+            self._map.flush()
+
+    def close(self):
+        'Flush the changes, then unmap and close the file'
+        if isinstance(self._map, mmap.mmap):
+            if self.writable:
+                self._map.flush()
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+#-------------------  CompressedBitVector Class --------------------
+
+class CompressedBitVector(object):
+    '''
+    A run-length compressed bitvector for bitmaps that are very sparse or
+    very dense.  Instead of the bits, it stores the sorted index positions
+    at which the bit value changes, taking the bit before index 0 to be 0.
+    So the boundaries come in pairs, each pair marking the first position
+    of a run of 1's and the position just after it, and a bitvector with k
+    runs of 1's takes up 2*k words however long it is.
+
+    A compressed bitvector is constructed from a BitVector, or as all 0's
+    from a size.  It cannot be changed once constructed.  Indexing,
+    count_bits(), next_set_bit() and the logical operators work directly on
+    the boundaries: a bit is looked up by binary search, and '&', '|' and
+    '^' merge the boundaries of their operands in a single pass, so their
+    cost grows with the number of runs rather than with the size.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        if args:
+            raise ValueError(
+                '''CompressedBitVector constructor can only be called with
+                   keyword arguments for the following keywords: bitvector
+                   and size''')
+        allowed_keys = 'bitvector', 'size'
+        keywords_used = kwargs.keys()
+        for keyword in keywords_used:
+            if keyword not in allowed_keys:
+                raise ValueError("Wrong keyword used --- check spelling")
+        bitvector = kwargs.pop('bitvector', None)
+        size = kwargs.pop('size', None)
+        self._boundaries = array.array(_WORD_TYPECODE)
+        if bitvector is not None:
+            if size is not None:
+                raise ValueError('''When bitvector is specified, you cannot give
+                                    a value to the size constructor arg''')
+            self.size = bitvector.size
+            # A bit of the XOR of the bits with the bits one position back
+            # is set wherever the bit value changes.  One extra position at
+            # the end records the end of a run of 1's that reaches it.
+            packed = bitvector._get_packed_int()
+            changes = BitVector(size=self.size + 1)
+            changes._set_packed_int(packed ^ (packed << 1))
+            self._boundaries.extend(changes.iter_set_bits())
+        elif size is not None and size >= 0:
+            self.size = size
+        else:
+            raise ValueError("wrong arg(s) for constructor")
+
+    @classmethod
+    def _from_boundaries(cls, size, boundaries):
+        res = cls(size=size)
+        res._boundaries.extend(boundaries)
+        return res
+
+    def to_bitvector(self):
+        'Returns an ordinary BitVector with the same bits'
+        res = BitVector(size=self.size)
+        # Where there is no 'Q' typecode, as on Python 2, the boundaries are
+        # kept in an array('L') whose items are longs, so convert them:
+        b = self._boundaries
+        for i in range(0, len(b), 2):
+            start = int(b[i])
+            length = int(b[i + 1]) - start
+            res._set_packed_bits(start, length, (1 << length) - 1)
+        return res
+
+    deep_copy = to_bitvector
+
+    def _get_packed_int(self):
+        return self.to_bitvector()._get_packed_int()
+
+    def _getbit(self, pos):
+        'Get the bit or the slice at the designated position'
+        if isinstance(pos, slice):
+            return self.to_bitvector()[pos]
+        if pos >= self.size or pos < -self.size:
+            raise ValueError("index range error")
+        if pos < 0:
+            pos = self.size + pos
+        # The bit is set if an odd number of boundaries are at or before it
+        return bisect.bisect_right(self._boundaries, pos) & 1
+
+    __getitem__ = _getbit
+
+    def __len__(self):
+        return self.size
+
+    def length(self):
+        return self.size
+
+    def __iter__(self):
+        return iter(self.to_bitvector())
+
+    def __str__(self):
+        return str(self.to_bitvector())
+
+    def int_val(self):
+        'Return the integer value of the bits'
+        return self.to_bitvector().int_val()
+
+    intValue = int_val
+    __int__ = int_val
+
+    def count_bits(self):
+        'Return the number of bits set, that is, the total length of the runs of 1s'
+        b = self._boundaries
+        return int(sum(b[1::2]) - sum(b[0::2]))
+
+    def next_set_bit(self, from_index=0):
+        '''
+        Return the index of the first set bit at or after from_index, or -1
+        if there is none.
+        '''
+        assert from_index >= 0, 'from_index must be nonnegative'
+        if from_index >= self.size:
+            return -1
+        k = bisect.bisect_right(self._boundaries, from_index)
+        if k & 1:
+            return from_index
+        if k < len(self._boundaries):
+            return int(self._boundaries[k])
+        return -1
+
+    def _merge(self, other, op):
+        '''
+        Sweeps through the boundaries of both operands in order, keeping
+        track of the bit value of each, and returns the boundaries at which
+        op applied to the two bit values changes.
+        '''
+        if self.size != other.size:
+            raise ValueError("compressed bitvectors must be of the same size")
+        x, y = self._boundaries, other._boundaries
+        lx, ly = len(x), len(y)
+        i = j = 0
+        a = b = value = 0
+        merged = []
+        while i < lx or j < ly:
+            if j == ly or (i < lx and x[i] <= y[j]):
+                pos = x[i]
+            else:
+                pos = y[j]
+            if i < lx and x[i] == pos:
+                a ^= 1
+                i += 1
+            if j < ly and y[j] == pos:
+                b ^= 1
+                j += 1
+            if op(a, b) != value:
+                value ^= 1
+                merged.append(pos)
+        return CompressedBitVector._from_boundaries(self.size, merged)
+
+    def __and__(self, other):
+        return self._merge(other, lambda a, b: a & b)
+
+    def __or__(self, other):
+        return self._merge(other, lambda a, b: a | b)
+
+    def __xor__(self, other):
+        return self._merge(other, lambda a, b: a ^ b)
+
+    def __invert__(self):
+        'Inverting toggles the bit value at both ends of the bitvector'
+        b = list(self._boundaries)
+        if b and b[0] == 0:
+            del b[0]
+        else:
+            b.insert(0, 0)
+        if b and b[-1] == self.size:
+            del b[-1]
+        else:
+            b.append(self.size)
+        if self.size == 0:
+            b = []
+        return CompressedBitVector._from_boundaries(self.size, b)
+
+    def __eq__(self, other):
+        if self.size != other.size:
+            return False
+        if isinstance(other, CompressedBitVector):
+            return self._boundaries == other._boundaries
+        return self.to_bitvector() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        'Hashes equal to a BitVector with the same bits'
+        return hash(self.to_bitvector())
+
+
 #-----------------------  BitVectorIterator Class -----------------------
 
 class BitVectorIterator:
+    '''
+    Iterates lazily over the bits of a bitvector.  The words are unpacked
+    into bits _ITER_CHUNK_WORDS at a time, looking up the bits of each byte
+    in _BYTE_BITS, so only that many words' worth of bits are ever held in
+    memory.
+    '''
 
     def __init__(self, bitvec):
-        self.items = []
-        for i in range(bitvec.size):
-            self.items.append(bitvec._getbit(i))
-        self.index = -1
+        words = bitvec.vector
+        chunks = (words[i:i + _ITER_CHUNK_WORDS]
+                  for i in range(0, len(words), _ITER_CHUNK_WORDS))
+        byte_bits = itertools.chain.from_iterable(
+            map(_BYTE_BITS.__getitem__, bytearray(_words_to_bytes(chunk)))
+            for chunk in chunks)
+        bits = itertools.chain.from_iterable(byte_bits)
+        self._bits = itertools.islice(bits, bitvec.size)
 
     def __iter__(self):
         return self
 
     def next(self):
-        self.index += 1
-        if self.index < len(self.items):
-            return self.items[self.index]
+        return next(self._bits)
+    __next__ = next
+
+#--------------------  BitVectorBlockIterator Class ---------------------
+
+class BitVectorBlockIterator:
+    '''
+    The iterator returned by BitVector.iter_blocks().  Unlike
+    _readblock(), it does not look a byte beyond a block to find out whether
+    the file has more to read, since it can just raise StopIteration when
+    a read comes back empty.  A block is therefore returned as soon as its
+    bytes have arrived, which matters for pipes and for sockets on which
+    the other end waits for a reply before sending any more.
+    '''
+
+    def __init__(self, source, blocksize, pad):
+        if blocksize <= 0 or blocksize % 8 != 0:
+            raise ValueError("block size must be a positive multiple of 8")
+        if hasattr(source, 'read'):
+            self.FILEIN = source
+            self._owns_file = False
         else:
+            self.FILEIN = open(source, 'rb')
+            self._owns_file = True
+        self.blocksize = blocksize
+        self.pad = pad
+        self.more_to_read = True
+        self._readahead = b''
+        self._readahead_pos = 0
+
+    def __iter__(self):
+        return self
+
+    def _read_block(self):
+        '''
+        Returns the next blocksize/8 bytes of the file, or fewer if the file
+        ends before that.  Buffered files are read with read1(), which takes
+        up to _READAHEAD_BYTES of whatever is already available; otherwise
+        only the missing bytes are asked for.
+        '''
+        nbytes = self.blocksize // 8
+        buf = self._readahead
+        pos = self._readahead_pos
+        if len(buf) - pos < nbytes:
+            buf = buf[pos:]
+            pos = 0
+            read1 = getattr(self.FILEIN, 'read1', None)
+            while len(buf) < nbytes:
+                if read1 is not None:
+                    chunk = read1(max(nbytes - len(buf), _READAHEAD_BYTES))
+                else:
+                    chunk = self.FILEIN.read(nbytes - len(buf))
+                if not chunk:
+                    self.more_to_read = False
+                    break
+                buf += chunk
+        block = buf[pos:pos + nbytes]
+        self._readahead = buf
+        self._readahead_pos = pos + len(block)
+        return block
+
+    def next(self):
+        if not self.more_to_read:
+            raise StopIteration
+        data = self._read_block()
+        if len(data) == 0:
             raise StopIteration
+        bv = BitVector(rawbytes=data)
+        if self.pad and bv.size < self.blocksize:
+            bv.pad_from_right(self.blocksize - bv.size)
+        return bv
     __next__ = next
 
+    def close(self):
+        'Closes the file if it was opened by the iterator'
+        self.more_to_read = False
+        if self._owns_file:
+            self.FILEIN.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 #------------------------  End of Class Definition -----------------------
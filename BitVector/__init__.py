@@ -9,6 +9,9 @@ if sys.version_info[0] == 3:
     from BitVector.BitVector import __url__
     from BitVector.BitVector import __copyright__
     from BitVector.BitVector import BitVector
+    from BitVector.BitVector import BitVectorView
+    from BitVector.BitVector import MappedBitVector
+    from BitVector.BitVector import CompressedBitVector
 else:
     from BitVector import __version__
     from BitVector import __author__
@@ -16,3 +19,6 @@ else:
     from BitVector import __url__
     from BitVector import __copyright__
     from BitVector import BitVector
+    from BitVector import BitVectorView
+    from BitVector import MappedBitVector
+    from BitVector import CompressedBitVector
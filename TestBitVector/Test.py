@@ -13,6 +13,13 @@ import TestConstructors
 import TestComparisonOps
 import TestPermutations
 import TestCircularShifts
+import TestSlicing
+import TestConversions
+import TestMappedBitVector
+import TestIteration
+import TestBitCounting
+import TestSearching
+import TestCompressedBitVector
 
 
 class BitVectorTestCase(unittest.TestCase):
@@ -29,6 +36,13 @@ for test_type in [
     TestComparisonOps,
     TestPermutations,
     TestCircularShifts,
+    TestSlicing,
+    TestConversions,
+    TestMappedBitVector,
+    TestIteration,
+    TestBitCounting,
+    TestSearching,
+    TestCompressedBitVector,
 ]:
     testSuites.append(test_type.getTestSuites('check'))
 
@@ -0,0 +1,87 @@
+import BitVector
+import unittest
+
+bv1 = BitVector.BitVector(bitstring='11111111')
+bv2 = BitVector.BitVector(bitstring='00101011')
+bv3 = BitVector.BitVector(bitstring='1' + '0' * 100 + '1' * 30)
+bv4 = BitVector.BitVector(bitstring='0' * 100 + '1' + '0' * 30)
+
+countingTests = [
+    ((bv1, None, 'count_bits'), 8),
+    ((bv2, None, 'count_bits'), 4),
+    ((bv3, None, 'count_bits'), 31),
+    ((bv3, None, 'count_bits_sparse'), 31),
+    ((BitVector.BitVector(size=0), None, 'count_bits'), 0),
+    ((bv1, bv2, 'hamming_distance'), 4),
+    ((bv3, bv4, 'hamming_distance'), 32),
+    ((bv1, bv2, 'jaccard_similarity'), 0.5),
+    ((bv1, bv2, 'jaccard_distance'), 0.5),
+    ((bv3, bv4, 'jaccard_similarity'), 0.0),
+    ((bv4, None, 'is_power_of_2_sparse'), True),
+    ((bv3, None, 'is_power_of_2_sparse'), False),
+]
+
+bv5 = BitVector.BitVector(bitstring='01010101011100')
+bv6 = BitVector.BitVector(bitstring='1' * 70 + '0' * 500 + '1' * 3)
+
+rankSelectTests = [
+    ((bv5, 10, 'rank_of_bit_set_at_index'), 6),
+    ((bv5, 9, 'rank1'), 5),
+    ((bv5, 9, 'rank0'), 5),
+    ((bv5, -1, 'rank1'), 7),
+    ((bv5, 6, 'select1'), 10),
+    ((bv5, 1, 'select0'), 0),
+    ((bv5, 7, 'select0'), 13),
+    ((bv6, 69, 'rank1'), 70),
+    ((bv6, 571, 'rank1'), 72),
+    ((bv6, 571, 'rank0'), 500),
+    ((bv6, 71, 'select1'), 570),
+    ((bv6, 500, 'select0'), 569),
+]
+
+
+class BitCountingTestCase(unittest.TestCase):
+
+    def checkBitCounting(self):
+        print("\nTesting bit counting")
+        for args, expected in countingTests:
+            try:
+                bitvec, other, op = args
+                if other is None:
+                    actual = getattr(bitvec, op)()
+                else:
+                    actual = getattr(bitvec, op)(other)
+                assert actual == expected
+            except Exception as e:
+                print(e)
+                print("        BIT COUNTING TEST FAILED")
+
+    def checkRankSelect(self):
+        print("\nTesting rank and select")
+        for args, expected in rankSelectTests:
+            try:
+                bitvec, arg, op = args
+                assert getattr(bitvec, op)(arg) == expected
+            except Exception as e:
+                print(e)
+                print("        RANK/SELECT TEST FAILED")
+        try:
+            bv = bv6.deep_copy()
+            assert bv.rank1(100) == 70
+            bv[100] = 1
+            assert bv.rank1(100) == 71
+            assert bv.select1(71) == 100
+            try:
+                bv.select1(75)
+                print("        RANK/SELECT TEST FAILED")
+            except ValueError:
+                pass
+        except Exception as e:
+            print(e)
+            print("        RANK/SELECT TEST FAILED")
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(BitCountingTestCase, type)
+    ])
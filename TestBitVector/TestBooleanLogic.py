@@ -6,6 +6,10 @@ bv2 = BitVector.BitVector(bitlist=[1, 1, 1, 1, 0, 0, 1, 1])
 bv3 = BitVector.BitVector(bitstring='00000000111111110000000')
 bv4 = BitVector.BitVector(bitstring='')
 bv5 = BitVector.BitVector(size=0)
+bv6 = BitVector.BitVector(bitstring='10' * 40)
+bv7 = BitVector.BitVector(bitstring='1100' * 20)
+bv8 = bv6 ^ bv7
+bv8[0] = 1
 
 
 logicTests = [
@@ -18,6 +22,16 @@ logicTests = [
     ((bv1, bv4, '|'), ''),
     ((bv1, bv5, '|'), ''),
     ((bv1, '', '~'), '11001100'),
+    ((bv1, bv2, '^'), '11000000'),
+    ((bv6, bv7, '&'), '1000' * 20),
+    ((bv6, bv7, '|'), '1110' * 20),
+    ((bv6, bv7, '^'), '0110' * 20),
+    ((bv6, '', '~'), '01' * 40),
+    ((bv8, bv6, '&'), '1010' + '0010' * 19),
+    ((bv1, bv2, '^='), '11000000'),
+    ((bv1, bv2, '&='), '00110011'),
+    ((bv1, bv2, '|='), '11110011'),
+    ((bv1, bv6, '^='), '10' * 36 + '10011001'),
 ]
 
 
@@ -32,8 +46,19 @@ class BooleanLogicTestCase(unittest.TestCase):
                     actual = args[0] & args[1]
                 elif (op == '|'):
                     actual = args[0] | args[1]
+                elif (op == '^'):
+                    actual = args[0] ^ args[1]
                 elif (op == '~'):
                     actual = ~args[0]
+                elif (op == '^='):
+                    actual = args[0].deep_copy()
+                    actual ^= args[1]
+                elif (op == '&='):
+                    actual = args[0].deep_copy()
+                    actual &= args[1]
+                elif (op == '|='):
+                    actual = args[0].deep_copy()
+                    actual |= args[1]
                 assert actual == BitVector.BitVector(bitstring=expected)
             except Exception as e:
                 if (args[0].size == args[1].size):
@@ -2,10 +2,24 @@ import BitVector
 import unittest
 
 bv = BitVector.BitVector(bitstring='00110011')
+bv2 = BitVector.BitVector(bitstring='1' + '0' * 69 + '1' * 30)
 
 circularShiftTests = [
-    ((3, '>>'), '01100110'),
-    ((3, '<<'), '10011001'),
+    ((bv, 3, '>>'), '01100110'),
+    ((bv, 3, '<<'), '10011001'),
+    ((bv, 11, '<<'), '10011001'),
+    ((bv, -3, '<<'), '01100110'),
+    ((bv2, 5, '<<'), '0' * 65 + '1' * 30 + '1' + '0' * 4),
+    ((bv2, 5, '>>'), '1' * 5 + '1' + '0' * 69 + '1' * 25),
+    ((bv, 3, 'shift_left'), '10011000'),
+    ((bv, 3, 'shift_right'), '00000110'),
+    ((bv, 9, 'shift_left'), '00000000'),
+    ((bv2, 70, 'shift_left'), '1' * 30 + '0' * 70),
+    ((bv2, 70, 'shift_right'), '0' * 70 + '1' + '0' * 29),
+    ((bv, 3, 'rotated_left'), '10011001'),
+    ((bv, 3, 'rotated_right'), '01100110'),
+    ((bv, 3, 'shifted_left'), '10011000'),
+    ((bv2, 70, 'shifted_right'), '0' * 70 + '1' + '0' * 29),
 ]
 
 
@@ -15,14 +29,22 @@ class CircularShiftTestCase(unittest.TestCase):
         print("\nTesting CircularShifts")
         for args, expected in circularShiftTests:
             try:
-                op = args[1]
+                op = args[2]
+                actual = BitVector.BitVector(bitstring=str(args[0]))
                 if (op == '>>'):
-                    actual = BitVector.BitVector(bitstring=str(bv))
-                    actual >> args[0]
+                    actual >> args[1]
                 elif (op == '<<'):
-                    actual = BitVector.BitVector(bitstring=str(bv))
-                    actual << args[0]
+                    actual << args[1]
+                elif (op == 'shift_left'):
+                    actual.shift_left(args[1])
+                elif (op == 'shift_right'):
+                    actual.shift_right(args[1])
+                elif (op in ('rotated_left', 'rotated_right',
+                             'shifted_left', 'shifted_right')):
+                    actual = getattr(args[0], op)(args[1])
+                    assert actual is not args[0]
                 assert actual == BitVector.BitVector(bitstring=expected)
+                assert str(args[0]) in ('00110011', '1' + '0' * 69 + '1' * 30)
             except Exception as e:
                 print(e)
                 print("        CIRCULAR SHIFT TEST FAILED")
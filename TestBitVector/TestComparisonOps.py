@@ -4,6 +4,9 @@ import unittest
 bv1 = BitVector.BitVector(bitstring='00110011')
 bv2 = BitVector.BitVector(bitlist=[0, 0, 1, 1, 0, 0, 1, 1])
 bv3 = BitVector.BitVector(intVal=5678)
+bv4 = BitVector.BitVector(bitstring='01' * 50)
+bv5 = BitVector.BitVector(bitstring='01' * 49 + '00')
+bv6 = BitVector.BitVector(bitstring='0' + '01' * 50)
 
 comparisonTests = [
     ((bv1, bv2, '=='), True),
@@ -13,6 +16,25 @@ comparisonTests = [
     ((bv1, bv3, '=='), False),
     ((bv3, bv1, '>'), True),
     ((bv3, bv1, '>='), True),
+    ((bv4, bv5, '=='), False),
+    ((bv4, bv6, '=='), False),
+    ((bv4, bv4.deep_copy(), '=='), True),
+    ((bv4, bv6[1:], '=='), True),
+    ((bv4, bv5, '>'), True),
+    ((bv4, bv5, '<='), False),
+    ((bv5, bv4, '<'), True),
+    ((bv4, bv6, '>='), True),
+    ((bv6, bv4, '<='), True),
+    ((bv6, bv4, '<'), False),
+    ((bv1, bv4, '<'), True),
+]
+
+hashTests = [
+    ((bv1, bv2), True),
+    ((bv4, bv6[1:]), True),
+    ((bv4, bv6.view(1)), True),
+    ((bv4, bv5), False),
+    ((bv4, bv6), False),
 ]
 
 
@@ -42,6 +64,26 @@ class ComparisonTestCases(unittest.TestCase):
                 print(e)
                 print("        COMPARISON TEST FAILED")
 
+    def checkHashing(self):
+        print("\nTesting hashing")
+        for args, expected in hashTests:
+            try:
+                assert (hash(args[0]) == hash(args[1])) == expected
+                assert (args[1] in set([args[0]])) == expected
+            except Exception as e:
+                print(e)
+                print("        HASH TEST FAILED")
+        try:
+            bv = bv4.deep_copy()
+            before = hash(bv)
+            bv[99] = 0
+            assert hash(bv) == hash(bv5) and hash(bv) != before
+            bv.pad_from_right(1)
+            assert hash(bv) == hash(BitVector.BitVector(bitstring=str(bv)))
+        except Exception as e:
+            print(e)
+            print("        HASH TEST FAILED")
+
 
 def getTestSuites(type):
     return unittest.TestSuite([
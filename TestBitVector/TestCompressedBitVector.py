@@ -0,0 +1,64 @@
+import BitVector
+import unittest
+
+bv1 = BitVector.BitVector(bitstring='0011100000001100' * 5)
+bv2 = BitVector.BitVector(bitstring='0' * 40 + '1' * 40)
+cbv1 = BitVector.CompressedBitVector(bitvector=bv1)
+cbv2 = BitVector.CompressedBitVector(bitvector=bv2)
+
+compressedTests = [
+    ((cbv1, cbv2, '&'), bv1 & bv2),
+    ((cbv1, cbv2, '|'), bv1 | bv2),
+    ((cbv1, cbv2, '^'), bv1 ^ bv2),
+    ((cbv1, None, '~'), ~bv1),
+    ((cbv2, None, '~'), ~bv2),
+    ((BitVector.CompressedBitVector(size=8), None, '~'),
+     BitVector.BitVector(bitstring='11111111')),
+]
+
+
+class CompressedBitVectorTestCase(unittest.TestCase):
+
+    def checkCompressedOperators(self):
+        print("\nTesting CompressedBitVector operators")
+        for args, expected in compressedTests:
+            try:
+                op = args[2]
+                if (op == '&'):
+                    actual = args[0] & args[1]
+                elif (op == '|'):
+                    actual = args[0] | args[1]
+                elif (op == '^'):
+                    actual = args[0] ^ args[1]
+                elif (op == '~'):
+                    actual = ~args[0]
+                assert isinstance(actual, BitVector.CompressedBitVector)
+                assert actual.to_bitvector() == expected
+            except Exception as e:
+                print(e)
+                print("        COMPRESSED BITVECTOR TEST FAILED")
+
+    def checkCompressedQueries(self):
+        print("\nTesting CompressedBitVector queries")
+        try:
+            assert cbv1.to_bitvector() == bv1
+            assert cbv1 == bv1
+            assert len(cbv1) == 80
+            assert str(cbv2) == str(bv2)
+            assert [cbv1[i] for i in range(80)] == list(bv1)
+            assert cbv1[-3] == 1 and cbv1[-1] == 0
+            assert cbv1.count_bits() == bv1.count_bits() == 25
+            assert cbv1.next_set_bit(5) == 12
+            assert cbv1.next_set_bit(13) == 13
+            assert cbv2.next_set_bit(0) == 40
+            assert BitVector.CompressedBitVector(size=100).next_set_bit(0) == -1
+            assert hash(cbv1) == hash(bv1)
+        except Exception as e:
+            print(e)
+            print("        COMPRESSED BITVECTOR TEST FAILED")
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(CompressedBitVectorTestCase, type)
+    ])
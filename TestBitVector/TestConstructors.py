@@ -1,7 +1,9 @@
 import BitVector
 import unittest
 import io
+import os
 import sys
+import threading
 
 constructorTests = [
     (('size', '0'), ''),
@@ -9,6 +11,14 @@ constructorTests = [
     (('bitlist', '(1,1,0,1)'), '1101'),
     (('bitlist', '[1,0,0,1]'), '1001'),
     (('intVal', '5678'), '1011000101110'),
+    (('intVal', '0'), '0'),
+    (('intVal', str(2 ** 70 + 5)), '1' + '0' * 67 + '101'),
+    (('intVal', '5678', '16'), '0001011000101110'),
+    (('hexstring', '0f'), '00001111'),
+    (('hexstring', 'a5C'), '101001011100'),
+    (('hexstring', 'ff' * 9), '1' * 72),
+    (('textstring', 'hello'), '0110100001100101011011000110110001101111'),
+    (('rawbytes', b'\x80\x01' * 5), '1000000000000001' * 5),
     (('bitstring', '00110011'), '00110011'),
     (('streamobject', '111100001111'), '111100001111'),
     (('filename', 'testinput1.txt'),
@@ -16,6 +26,21 @@ constructorTests = [
 ]
 
 
+class ReadOnlyStream:
+    '''
+    A stream with only a read() method, like a raw pipe, that remembers
+    how many bytes it was asked for each time.
+    '''
+
+    def __init__(self, data):
+        self.stream = io.BytesIO(data)
+        self.requests = []
+
+    def read(self, n):
+        self.requests.append(n)
+        return self.stream.read(n)
+
+
 class ConstructorTestCases(unittest.TestCase):
 
     def checkConstructors(self):
@@ -27,8 +52,17 @@ class ConstructorTestCases(unittest.TestCase):
                     bitvec = BitVector.BitVector(size=eval(args[1]))
                 elif (mode == 'bitlist'):
                     bitvec = BitVector.BitVector(bitlist=eval(args[1]))
+                elif (mode == 'intVal' and len(args) == 3):
+                    bitvec = BitVector.BitVector(intVal=int(args[1]),
+                                                 size=int(args[2]))
                 elif (mode == 'intVal'):
                     bitvec = BitVector.BitVector(intVal=int(args[1]))
+                elif (mode == 'hexstring'):
+                    bitvec = BitVector.BitVector(hexstring=args[1])
+                elif (mode == 'textstring'):
+                    bitvec = BitVector.BitVector(textstring=args[1])
+                elif (mode == 'rawbytes'):
+                    bitvec = BitVector.BitVector(rawbytes=args[1])
                 elif (mode == 'bitstring'):
                     bitvec = BitVector.BitVector(bitstring=args[1])
                 elif (mode == 'streamobject'):
@@ -47,6 +81,70 @@ class ConstructorTestCases(unittest.TestCase):
                 print(e)
                 print("        CONSTRUCTOR TEST FAILED")
 
+    def checkReadingBlocks(self):
+        print("\nTesting reading a file in blocks")
+        try:
+            with open('testinput1.txt', 'rb') as f:
+                expected = BitVector.BitVector(rawbytes=f.read())
+            bvec = BitVector.BitVector(filename='testinput1.txt')
+            blocks = []
+            while (bvec.more_to_read):
+                blocks.append(bvec.read_bits_from_file(24))
+            bvec.close_file_object()
+            assert [len(block) for block in blocks] == [24] * 27 + [8]
+            actual = blocks[0]
+            for block in blocks[1:]:
+                actual = actual + block
+            assert actual == expected
+            bvec = BitVector.BitVector(filename='testinput5.txt')
+            assert len(bvec.read_bits_from_file(64)) == 64
+            assert not bvec.more_to_read
+            bvec.close_file_object()
+        except Exception as e:
+            print(e)
+            print("        FILE READING TEST FAILED")
+
+    def checkIterBlocks(self):
+        print("\nTesting iter_blocks")
+        try:
+            with open('testinput1.txt', 'rb') as f:
+                data = f.read()
+            with BitVector.BitVector.iter_blocks('testinput1.txt', 24) as blocks:
+                sizes = [len(block) for block in blocks]
+            assert sizes == [24] * 27 + [8]
+            assert blocks.FILEIN.closed
+            stream = io.BytesIO(data)
+            with BitVector.BitVector.iter_blocks(stream, 64, pad=True) as blocks:
+                actual = list(blocks)
+            assert not stream.closed
+            assert [len(block) for block in actual] == [64] * 11
+            assert actual[-1] == BitVector.BitVector(rawbytes=data[80:] + b'\0' * 6)
+            assert list(BitVector.BitVector.iter_blocks(io.BytesIO(b''), 8)) == []
+            stream = ReadOnlyStream(data)
+            blocks = BitVector.BitVector.iter_blocks(stream, 64)
+            assert next(blocks) == BitVector.BitVector(rawbytes=data[:8])
+            assert max(stream.requests) <= 8
+            # A full block written to a pipe that is left open must come
+            # back without waiting for more bytes:
+            read_fd, write_fd = os.pipe()
+            with os.fdopen(read_fd, 'rb') as pipe:
+                os.write(write_fd, data[:8])
+                blocks = BitVector.BitVector.iter_blocks(pipe, 64)
+                received = []
+                reader = threading.Thread(target=lambda: received.append(next(blocks)))
+                reader.daemon = True
+                reader.start()
+                reader.join(5)
+                on_time = list(received)
+                os.write(write_fd, data[8:10])
+                os.close(write_fd)
+                reader.join()
+                assert on_time == [BitVector.BitVector(rawbytes=data[:8])]
+                assert list(blocks) == [BitVector.BitVector(rawbytes=data[8:10])]
+        except Exception as e:
+            print(e)
+            print("        ITER_BLOCKS TEST FAILED")
+
 
 def getTestSuites(type):
     return unittest.TestSuite([
@@ -0,0 +1,94 @@
+import BitVector
+import io
+import sys
+import unittest
+
+bv1 = BitVector.BitVector(bitstring='1111000010101')
+bv2 = BitVector.BitVector(hexstring='68656c6c6f')
+bv3 = BitVector.BitVector(bitstring='10' * 40)
+
+bytesTests = [
+    (bv1, b'\xf0\xa8'),
+    (bv2, b'hello'),
+    (bv3, b'\xaa' * 10),
+    (BitVector.BitVector(size=0), b''),
+    (BitVector.BitVector(bitstring='1'), b'\x80'),
+]
+
+
+class ConversionTestCases(unittest.TestCase):
+
+    def checkToBytes(self):
+        print("\nTesting to_bytes")
+        for bitvec, expected in bytesTests:
+            try:
+                assert bitvec.to_bytes() == expected
+                if bitvec.size % 8 == 0 and bitvec.size:
+                    roundtrip = BitVector.BitVector(rawbytes=bitvec.to_bytes())
+                    assert roundtrip == bitvec
+            except Exception as e:
+                print(e)
+                print("        TO_BYTES TEST FAILED")
+
+    def checkWriteToFile(self):
+        print("\nTesting writing to a file")
+        try:
+            bv = BitVector.BitVector(hexstring='00ff80417f')
+            out = io.BytesIO()
+            bv.write_to_file(out)
+            assert out.getvalue() == b'\x00\xff\x80A\x7f'
+            out = io.BytesIO()
+            blocks = (BitVector.BitVector(intVal=i, size=16) for i in range(300))
+            BitVector.BitVector.write_bitvectors_to_file(out, blocks)
+            assert len(out.getvalue()) == 600
+            assert out.getvalue()[510:512] == b'\x00\xff'
+            out = io.BytesIO()
+            try:
+                BitVector.BitVector.write_bitvectors_to_file(
+                    out, [bv, BitVector.BitVector(bitstring='101')])
+                print("        WRITE TO FILE TEST FAILED")
+            except ValueError:
+                assert out.getvalue() == b'\x00\xff\x80A\x7f'
+        except Exception as e:
+            print(e)
+            print("        WRITE TO FILE TEST FAILED")
+
+    def checkWriteBitsToFileobject(self):
+        print("\nTesting writing bits to a file object")
+        for bitvec in (bv1, bv3, BitVector.BitVector(size=0)):
+            try:
+                if sys.version_info[0] == 3:
+                    fp_write = io.StringIO()
+                else:
+                    fp_write = io.StringIO(unicode(''))
+                bitvec.write_bits_to_fileobject(fp_write)
+                assert fp_write.getvalue() == str(bitvec)
+                assert str(bitvec) == ''.join(str(bit) for bit in bitvec)
+            except Exception as e:
+                print(e)
+                print("        WRITE BITS TEST FAILED")
+
+    def checkHexAndAscii(self):
+        print("\nTesting hex and ascii conversions")
+        try:
+            assert bv2.get_bitvector_in_hex() == '68656c6c6f'
+            assert bv2.get_bitvector_in_ascii() == 'hello'
+            assert bv3.get_bitvector_in_hex() == 'aa' * 10
+            assert BitVector.BitVector(hexstring='abc').get_bitvector_in_hex() == 'abc'
+            assert bv1.get_bitvector_in_hex(pad=True) == 'f0a8'
+            text = ''.join(map(chr, range(256)))
+            assert BitVector.BitVector(textstring=text).get_bitvector_in_ascii() == text
+            try:
+                bv1.get_bitvector_in_hex()
+                print("        HEX CONVERSION TEST FAILED")
+            except ValueError:
+                pass
+        except Exception as e:
+            print(e)
+            print("        HEX CONVERSION TEST FAILED")
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(ConversionTestCases, type)
+    ])
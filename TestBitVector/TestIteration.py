@@ -0,0 +1,81 @@
+import BitVector
+import unittest
+
+bv1 = BitVector.BitVector(bitstring='0010010000001')
+bv2 = BitVector.BitVector(bitstring='1' + '0' * 200 + '1' * 3)
+bv3 = BitVector.BitVector(bitstring='1101111')
+
+iterationTests = [
+    ((bv1, 'iter'), [0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1]),
+    ((bv1, 'iter_set_bits'), [2, 5, 12]),
+    ((bv1, 'iter_clear_bits'), [0, 1, 3, 4, 6, 7, 8, 9, 10, 11]),
+    ((bv2, 'iter_set_bits'), [0, 201, 202, 203]),
+    ((bv2, 'iter_clear_bits'), list(range(1, 201))),
+    ((bv3, 'iter_clear_bits'), [2]),
+    ((BitVector.BitVector(size=0), 'iter'), []),
+    ((BitVector.BitVector(size=0), 'iter_set_bits'), []),
+]
+
+bv4 = BitVector.BitVector(bitstring='0011100000001100')
+
+scanTests = [
+    ((bv4, 5, 'next_set_bit'), 12),
+    ((bv4, 14, 'next_set_bit'), -1),
+    ((bv4, 10, 'prev_set_bit'), 4),
+    ((bv4, 1, 'prev_set_bit'), -1),
+    ((bv4, 2, 'next_clear_bit'), 5),
+    ((bv4, 13, 'prev_clear_bit'), 11),
+    ((bv4, None, 'first_set_bit'), 2),
+    ((bv4, None, 'last_set_bit'), 13),
+    ((bv2, 1, 'next_set_bit'), 201),
+    ((bv2, 200, 'prev_set_bit'), 0),
+    ((bv2, 201, 'next_clear_bit'), -1),
+    ((bv2, 203, 'prev_clear_bit'), 200),
+    ((BitVector.BitVector(size=100), None, 'first_set_bit'), -1),
+    ((BitVector.BitVector(size=100), None, 'last_set_bit'), -1),
+]
+
+
+class IterationTestCase(unittest.TestCase):
+
+    def checkIteration(self):
+        print("\nTesting iteration")
+        for args, expected in iterationTests:
+            try:
+                bitvec, op = args
+                if (op == 'iter'):
+                    actual = list(bitvec)
+                elif (op == 'iter_set_bits'):
+                    actual = list(bitvec.iter_set_bits())
+                elif (op == 'iter_clear_bits'):
+                    actual = list(bitvec.iter_clear_bits())
+                assert actual == expected
+            except Exception as e:
+                print(e)
+                print("        ITERATION TEST FAILED")
+        try:
+            assert sum(bv2) == 4
+            assert [bit for bit in bv2][199:204] == [0, 0, 1, 1, 1]
+        except Exception as e:
+            print(e)
+            print("        ITERATION TEST FAILED")
+
+    def checkBitScanning(self):
+        print("\nTesting bit scanning")
+        for args, expected in scanTests:
+            try:
+                bitvec, from_index, op = args
+                if from_index is None:
+                    actual = getattr(bitvec, op)()
+                else:
+                    actual = getattr(bitvec, op)(from_index)
+                assert actual == expected
+            except Exception as e:
+                print(e)
+                print("        BIT SCANNING TEST FAILED")
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(IterationTestCase, type)
+    ])
@@ -0,0 +1,73 @@
+import BitVector
+import os
+import shutil
+import tempfile
+import unittest
+
+
+def read_testinput():
+    with open('testinput1.txt', 'rb') as f:
+        return BitVector.BitVector(rawbytes=f.read())
+
+
+class MappedBitVectorTestCase(unittest.TestCase):
+
+    def checkMappedReading(self):
+        print("\nTesting MappedBitVector reading")
+        try:
+            bv = read_testinput()
+            with BitVector.MappedBitVector('testinput1.txt') as mapped:
+                assert len(mapped) == len(bv)
+                assert mapped == bv and bv == mapped
+                assert mapped == bv.view() and bv.view() == mapped
+                other = bv.deep_copy()
+                other[-1] = 1 - other[-1]
+                assert mapped != other and other != mapped
+                assert int(mapped) == int(bv)
+                assert mapped.count_bits() == bv.count_bits()
+                assert mapped[9] == bv[9] and mapped[-1] == bv[-1]
+                assert mapped[13:90] == bv[13:90]
+                assert mapped[5:300:7] == bv[5:300:7]
+                for i in (0, 1, 100, 655):
+                    assert mapped.next_set_bit(i) == bv.next_set_bit(i)
+                assert (mapped ^ bv).count_bits() == 0
+                assert list(mapped) == list(bv)
+        except Exception as e:
+            print(e)
+            print("        MAPPED BITVECTOR TEST FAILED")
+
+    def checkMappedWriting(self):
+        print("\nTesting MappedBitVector writing")
+        tmpdir = tempfile.mkdtemp()
+        try:
+            bv = read_testinput()
+            filename = os.path.join(tmpdir, 'bitmap.bin')
+            shutil.copy('testinput1.txt', filename)
+            expected = bv.deep_copy()
+            other = BitVector.BitVector(bitstring='0110' * (len(bv) // 4))
+            with BitVector.MappedBitVector(filename, writable=True) as mapped:
+                mapped[3] = 1
+                expected[3] = 1
+                mapped[20:36] = BitVector.BitVector(hexstring='beef')
+                expected[20:36] = BitVector.BitVector(hexstring='beef')
+                mapped ^= other
+                expected ^= other
+            with open(filename, 'rb') as f:
+                assert BitVector.BitVector(rawbytes=f.read()) == expected
+            with BitVector.MappedBitVector(filename) as mapped:
+                try:
+                    mapped[0] = 1
+                    print("        MAPPED BITVECTOR TEST FAILED")
+                except TypeError:
+                    pass
+        except Exception as e:
+            print(e)
+            print("        MAPPED BITVECTOR TEST FAILED")
+        finally:
+            shutil.rmtree(tmpdir)
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(MappedBitVectorTestCase, type)
+    ])
@@ -0,0 +1,86 @@
+import BitVector
+import unittest
+
+bv1 = BitVector.BitVector(bitstring='0001101011010110')
+bv2 = BitVector.BitVector(bitstring='1010101')
+bv3 = BitVector.BitVector(bitstring='0' * 100 + '11001' + '0' * 50 + '11001')
+pattern1 = BitVector.BitVector(bitstring='1011')
+pattern2 = BitVector.BitVector(bitstring='101')
+pattern3 = BitVector.BitVector(bitstring='11001')
+
+searchTests = [
+    ((bv1, pattern1, 'find', ()), 6),
+    ((bv1, pattern1, 'find', (5,)), 6),
+    ((bv1, pattern1, 'find', (5, 12)), 6),
+    ((bv1, pattern1, 'rfind', ()), 11),
+    ((bv1, pattern1, 'rfind', (0, 12)), 6),
+    ((bv1, pattern1, 'find_all', ()), [6, 11]),
+    ((bv1, pattern1, 'count_occurrences', ()), 2),
+    ((bv2, pattern2, 'find_all', ()), [0, 2, 4]),
+    ((bv2, pattern2, 'count_occurrences', (1,)), 2),
+    ((bv2, pattern1, 'find', ()), -1),
+    ((bv3, pattern3, 'find_all', ()), [100, 155]),
+    ((bv3, pattern3, 'find', (-10,)), 155),
+]
+
+containsTests = [
+    ((pattern1, bv1), True),
+    ((BitVector.BitVector(bitstring='111'), bv1), False),
+    ((pattern3, bv3), True),
+    ((bv1.view(3, 9), bv1), True),
+]
+
+runTests = [
+    (BitVector.BitVector(bitlist=(1, 1, 1, 0, 0, 1)),
+     [(1, 0, 3), (0, 3, 2), (1, 5, 1)], ['111', '00', '1']),
+    (BitVector.BitVector(bitstring='0'), [(0, 0, 1)], ['0']),
+    (bv3, [(0, 0, 100), (1, 100, 2), (0, 102, 2), (1, 104, 1), (0, 105, 50),
+           (1, 155, 2), (0, 157, 2), (1, 159, 1)],
+     ['0' * 100, '11', '00', '1', '0' * 50, '11', '00', '1']),
+    (BitVector.BitVector(size=0), [], None),
+]
+
+
+class SearchingTestCase(unittest.TestCase):
+
+    def checkSearching(self):
+        print("\nTesting searching")
+        for args, expected in searchTests:
+            try:
+                bitvec, pattern, op, extra = args
+                actual = getattr(bitvec, op)(pattern, *extra)
+                assert actual == expected
+            except Exception as e:
+                print(e)
+                print("        SEARCH TEST FAILED")
+
+    def checkContains(self):
+        print("\nTesting 'in'")
+        for args, expected in containsTests:
+            try:
+                assert (args[0] in args[1]) == expected
+            except Exception as e:
+                print(e)
+                print("        CONTAINS TEST FAILED")
+        try:
+            bv1 in pattern1
+            print("        CONTAINS TEST FAILED")
+        except ValueError:
+            pass
+
+    def checkRuns(self):
+        print("\nTesting runs")
+        for bitvec, expected_lengths, expected_runs in runTests:
+            try:
+                assert bitvec.run_lengths() == expected_lengths
+                if expected_runs is not None:
+                    assert bitvec.runs() == expected_runs
+            except Exception as e:
+                print(e)
+                print("        RUNS TEST FAILED")
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(SearchingTestCase, type)
+    ])
@@ -0,0 +1,108 @@
+import BitVector
+import unittest
+
+bv1 = BitVector.BitVector(bitstring='0011010011')
+bv2 = BitVector.BitVector(bitstring='10' * 50)
+
+slicingTests = [
+    ((bv1, slice(2, 7)), '11010'),
+    ((bv1, slice(None, 3)), '001'),
+    ((bv1, slice(7, None)), '011'),
+    ((bv1, slice(-4, None)), '0011'),
+    ((bv1, slice(5, 2)), ''),
+    ((bv1, slice(None, None, 2)), '01001'),
+    ((bv1, slice(None, None, -1)), '1100101100'),
+    ((bv2, slice(60, 70)), '1010101010'),
+    ((bv2, slice(1, 100, 2)), '0' * 50),
+    ((bv2, slice(61, 70, 3)), '010'),
+    ((bv2, slice(70, 61, -3)), '101'),
+    ((bv2, slice(3, None, -2)), '00'),
+]
+
+sliceAssignmentTests = [
+    ((bv1, slice(2, 5), '000'), '0000010011'),
+    ((bv1, slice(None, 3), '111'), '1111010011'),
+    ((bv1, slice(7, None), '100'), '0011010100'),
+    ((bv1, slice(None, None), '1' * 10), '1' * 10),
+    ((bv1, slice(None, None, 3), '1010'), '1010011010'),
+    ((bv2, slice(62, 66), '0000'), '10' * 31 + '0000' + '10' * 17),
+]
+
+viewTests = [
+    ((bv1, 2, 7, 'str'), '11010'),
+    ((bv1, 2, 7, 'int'), 26),
+    ((bv1, 2, 7, 'count_bits'), 3),
+    ((bv2, 61, 131, 'str'), '01' * 19 + '0'),
+    ((bv2, 61, 70, 'int'), int('010101010', 2)),
+    ((bv2, 60, 68, '~'), '01' * 4),
+    ((bv2, 60, 68, '^'), '1' * 8),
+]
+
+
+class SlicingTestCase(unittest.TestCase):
+
+    def checkSlicing(self):
+        print("\nTesting slicing")
+        for args, expected in slicingTests:
+            try:
+                actual = args[0][args[1]]
+                assert actual == BitVector.BitVector(bitstring=expected)
+            except Exception as e:
+                print(e)
+                print("        SLICING TEST FAILED")
+
+    def checkSliceAssignment(self):
+        print("\nTesting slice assignment")
+        for args, expected in sliceAssignmentTests:
+            try:
+                actual = args[0].deep_copy()
+                actual[args[1]] = BitVector.BitVector(bitstring=args[2])
+                assert actual == BitVector.BitVector(bitstring=expected)
+            except Exception as e:
+                print(e)
+                print("        SLICE ASSIGNMENT TEST FAILED")
+        try:
+            bv1[2:5] = BitVector.BitVector(bitstring='0000')
+            print("        SLICE ASSIGNMENT TEST FAILED")
+        except ValueError:
+            pass
+
+    def checkViews(self):
+        print("\nTesting views")
+        for args, expected in viewTests:
+            try:
+                view = args[0].view(args[1], args[2])
+                op = args[3]
+                if (op == 'str'):
+                    actual = str(view)
+                elif (op == 'int'):
+                    actual = int(view)
+                elif (op == 'count_bits'):
+                    actual = view.count_bits()
+                elif (op == '~'):
+                    actual = str(~view)
+                elif (op == '^'):
+                    actual = str(view ^ BitVector.BitVector(bitstring='01' * 4))
+                assert actual == expected
+            except Exception as e:
+                print(e)
+                print("        VIEW TEST FAILED")
+        try:
+            parent = bv1.deep_copy()
+            view = parent.view(2, 7)
+            assert view == BitVector.BitVector(bitstring='11010')
+            parent[3] = 0
+            assert str(view) == '10010'
+            view[0] = 0
+            assert str(view) == '00010'
+            assert str(parent) == '0010010011'
+            assert str(view[1:4]) == '001'
+        except Exception as e:
+            print(e)
+            print("        VIEW TEST FAILED")
+
+
+def getTestSuites(type):
+    return unittest.TestSuite([
+        unittest.makeSuite(SlicingTestCase, type)
+    ])
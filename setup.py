@@ -39,14 +39,20 @@ The class is provided with the following operators/methods:
 -      __and__
 -      __xor__
 -      __invert__
+-      __ixor__, __iand__, __ior__
 -      __lshift__
 -      __rshift__
 -      __add__
+-      and_into               (in-place AND)
 -      close_file_object
 -      count_bits
 -      count_bits_sparse      (faster for sparse bit vectors)
+-      count_occurrences      (of a bit pattern)
 -      deep_copy
 -      divide_into_two
+-      find                   (for finding a bit pattern)
+-      find_all
+-      first_set_bit
 -      gcd                    (for greatest common divisor)
 -      gen_random_bits
 -      get_bitvector_in_ascii
@@ -59,27 +65,47 @@ The class is provided with the following operators/methods:
 -      int_val                (for returning the integer value)
 -      is_power_of_2
 -      is_power_of_2_sparse   (faster for sparse bit vectors)
+-      iter_blocks            (for streaming a file in fixed-size blocks)
+-      iter_clear_bits        (positions of the bits that are not set)
+-      iter_set_bits          (positions of the set bits)
 -      jaccard_distance
 -      jaccard_similarity
+-      last_set_bit
 -      length
 -      multiplicative_inverse
+-      next_clear_bit
 -      next_set_bit
+-      or_into                (in-place OR)
 -      pad_from_left
 -      pad_from_right
 -      permute
+-      prev_clear_bit
+-      prev_set_bit
+-      rank0, rank1           (number of bits not set or set up to a position)
 -      rank_of_bit_set_at_index
 -      read_bits_from_file
 -      reset
 -      reverse
+-      rfind
+-      rotated_left           (non-mutating circular left shift)
+-      rotated_right          (non-mutating circular right shift)
+-      run_lengths            (runs as (value, start, length) tuples)
 -      runs
+-      select0, select1       (position of the k-th bit not set or set)
 -      set_value
 -      shift_left             (for non-circular left shift)
 -      shift_right            (for non-circular right shift)
+-      shifted_left           (non-mutating non-circular left shift)
+-      shifted_right          (non-mutating non-circular right shift)
 -      slice assignment
 -      test_for_primality
+-      to_bytes               (also bytes() and memoryview())
 -      unpermute
+-      view                   (zero-copy view of a range of bits)
 -      write_to_file
+-      write_bitvectors_to_file (for writing many bitvectors at once)
 -      write_bits_to_fileobject
+-      xor_into               (in-place XOR)
 
           ''',
       license='Python Software Foundation License',